@@ -5,6 +5,11 @@ This module provides functionality to download and manage cybersecurity datasets
 from Hugging Face Hub. It automatically handles dataset caching, directory creation,
 and supports both single-split and multi-split datasets.
 
+Datasets are downloaded concurrently, one split per Parquet file. Completed
+files are recorded with their size and SHA-256 in ``download_manifest.json``
+so interrupted runs resume with the missing splits only. Air-gapped nodes can
+ingest a local mirror (a copy of another node's ``data/raw``) instead.
+
 Supported datasets:
 - Heimdall: Cybersecurity conversation dataset
 - TTP Mapping: MITRE ATT&CK technique mapping
@@ -14,29 +19,112 @@ Supported datasets:
 Author: DSR Portfolio Project Team
 """
 
-import os
-import pandas as pd
+import argparse
+import hashlib
+import json
+import shutil
+import threading
+import pyarrow.parquet as pq
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from datasets import load_dataset
+from typing import Any, Dict, Optional
+from datasets import get_dataset_split_names, load_dataset
 from utils.logger import setup_logger
-from utils.config import get_data_path, get_raw_path
+from utils.config import get_config, get_data_path, get_raw_path
 
 logger = setup_logger()
 
+MANIFEST_FILE = "download_manifest.json"
+
+
+def file_sha256(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024**2), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DownloadManifest:
+    """Thread-safe record of the dataset files that were completely written."""
+
+    def __init__(self, path: Path):
+        """Load the manifest at ``path``, empty if it does not exist yet."""
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, name: str, file_name: str) -> Optional[Dict[str, Any]]:
+        """Return the entry of a dataset file, or None if it is not recorded."""
+        with self.lock:
+            return self.entries.get(name, {}).get(file_name)
+
+    def completed(self, name: str, path: Path) -> bool:
+        """
+        Check whether a dataset file is complete.
+
+        A recorded file is complete if it still has its recorded size. Files
+        written before the manifest existed are adopted if their Parquet
+        footer is readable.
+        """
+        if not path.exists():
+            return False
+        entry = self.get(name, path.name)
+        if entry is not None:
+            return entry["size"] == path.stat().st_size
+        try:
+            pq.read_metadata(path)
+        except Exception:
+            return False
+        self.record(name, path, source="existing")
+        return True
 
-def download_dataset(name: str, dataset_id: str, folder_name: str) -> None:
+    def record(
+        self, name: str, path: Path, source: str, sha256: Optional[str] = None
+    ) -> None:
+        """Fingerprint a written file and atomically save the manifest."""
+        entry = {
+            "rows": pq.read_metadata(path).num_rows,
+            "size": path.stat().st_size,
+            "sha256": sha256 or file_sha256(path),
+            "source": source,
+            "completed_at": datetime.now().isoformat(),
+        }
+        with self.lock:
+            self.entries.setdefault(name, {})[path.name] = entry
+            tmp_file = self.path.with_suffix(".json.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2)
+            tmp_file.replace(self.path)
+
+
+def download_dataset(
+    name: str,
+    dataset_id: str,
+    folder_name: str,
+    manifest: Optional[DownloadManifest] = None,
+) -> None:
     """
     Download and save a single dataset from Hugging Face Hub.
 
-    This function downloads a dataset, checks for existing files to avoid re-downloading,
-    and saves it in Parquet format. It automatically handles both single-split datasets
-    (with 'train' attribute) and multi-split datasets (dictionary format).
+    Every split is downloaded and saved separately as
+    ``{name}_{split}.parquet``. Splits already recorded as complete in the
+    manifest are skipped, so an interrupted download resumes with the
+    remaining splits. Files are written under a temporary name and renamed
+    once complete.
 
     Args:
         name (str): Short name identifier for the dataset (e.g., 'heimdall')
         dataset_id (str): Hugging Face Hub dataset identifier (e.g., 'AlicanKiraz0/Cybersecurity-Dataset-Heimdall-v1.1')
         folder_name (str): Local folder name where the dataset will be stored
+        manifest (DownloadManifest): Manifest of completed files, defaults to
+            the one in the raw data directory
 
     Returns:
         None
@@ -50,29 +138,35 @@ def download_dataset(name: str, dataset_id: str, folder_name: str) -> None:
         [2025-06-24 20:40:18] INFO: Dataset 'heimdall' saved to data/raw/heimdall
     """
     try:
-        logger.info(f"Downloading dataset '{name}'...")
+        manifest = manifest or DownloadManifest(get_raw_path() / MANIFEST_FILE)
 
         # Create specific subfolder if not exists (recursive)
         dataset_dir = get_raw_path() / folder_name
         dataset_dir.mkdir(parents=True, exist_ok=True)
 
-        # Check if dataset already exists
-        if (dataset_dir / f"{name}.parquet").exists():
+        # Check which splits are still missing
+        splits = get_dataset_split_names(dataset_id)
+        pending = [
+            split
+            for split in splits
+            if not manifest.completed(name, dataset_dir / f"{name}_{split}.parquet")
+        ]
+        if not pending:
             logger.info(f"Dataset '{name}' already exists, skipping download")
             return
-
-        # Load dataset if not exists
-        dataset = load_dataset(dataset_id)
-
-        # Auto-save based on format
-        if hasattr(dataset, "train"):
-            df = dataset["train"].to_pandas()
-            df.to_parquet(dataset_dir / f"{name}.parquet", index=False)
+        if len(pending) < len(splits):
+            logger.info(f"Resuming dataset '{name}': missing splits {pending}")
         else:
-            # Handle dict format
-            for split, data in dataset.items():
-                df = data.to_pandas()
-                df.to_parquet(dataset_dir / f"{name}_{split}.parquet", index=False)
+            logger.info(f"Downloading dataset '{name}'...")
+
+        for split in pending:
+            target = dataset_dir / f"{name}_{split}.parquet"
+            tmp_file = target.with_suffix(".parquet.tmp")
+            df = load_dataset(dataset_id, split=split).to_pandas()
+            df.to_parquet(tmp_file, index=False)
+            tmp_file.replace(target)
+            manifest.record(name, target, source=dataset_id)
+            logger.info(f"Saved split '{split}' of '{name}' ({len(df)} rows)")
 
         logger.info(f"Dataset '{name}' saved to {dataset_dir}")
 
@@ -80,7 +174,85 @@ def download_dataset(name: str, dataset_id: str, folder_name: str) -> None:
         logger.error(f"Failed to download dataset '{name}': {str(e)}")
 
 
+def ingest_from_mirror(
+    name: str, folder_name: str, mirror_dir: Path, manifest: DownloadManifest
+) -> None:
+    """
+    Copy a dataset from a local mirror instead of downloading it.
+
+    The mirror has the layout of ``data/raw`` (``{mirror}/{folder}/*.parquet``).
+    If it contains a ``download_manifest.json``, each copy is checked
+    against the SHA-256 recorded there and discarded on mismatch.
+
+    Args:
+        name: Short name identifier for the dataset (e.g., 'heimdall')
+        folder_name: Folder of the dataset in the mirror and in ``data/raw``
+        mirror_dir: Root of the mirror
+        manifest: Manifest of completed files in the raw data directory
+    """
+    try:
+        source_files = sorted((mirror_dir / folder_name).glob("*.parquet"))
+        if not source_files:
+            logger.error(f"Dataset '{name}' not found in mirror {mirror_dir}")
+            return
+
+        mirror_manifest_file = mirror_dir / MANIFEST_FILE
+        mirror_manifest = (
+            DownloadManifest(mirror_manifest_file)
+            if mirror_manifest_file.exists()
+            else None
+        )
+
+        dataset_dir = get_raw_path() / folder_name
+        dataset_dir.mkdir(parents=True, exist_ok=True)
+
+        copied = 0
+        for source in source_files:
+            target = dataset_dir / source.name
+            if manifest.completed(name, target):
+                continue
+            tmp_file = target.with_suffix(".parquet.tmp")
+            shutil.copyfile(source, tmp_file)
+            sha256 = file_sha256(tmp_file)
+
+            expected = (
+                mirror_manifest.get(name, source.name) if mirror_manifest else None
+            )
+            if expected and expected["sha256"] != sha256:
+                tmp_file.unlink()
+                logger.error(f"Checksum mismatch for {source}, file discarded")
+                continue
+            tmp_file.replace(target)
+            manifest.record(name, target, source=str(source), sha256=sha256)
+            copied += 1
+
+        logger.info(
+            f"Dataset '{name}' ingested from mirror: {copied} files copied, "
+            f"{len(source_files) - copied} already present or rejected"
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to ingest dataset '{name}' from mirror: {str(e)}")
+
+
 if __name__ == "__main__":
+    config = get_config()
+    parser = argparse.ArgumentParser(description="Download the cybersecurity datasets")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.DATASET_DOWNLOAD_WORKERS,
+        help="Datasets downloaded in parallel (default: DATASET_DOWNLOAD_WORKERS)",
+    )
+    parser.add_argument(
+        "--mirror",
+        type=Path,
+        default=config.DATASET_MIRROR_DIR,
+        help="Copy datasets from this local mirror instead of Hugging Face Hub "
+        "(default: DATASET_MIRROR_DIR)",
+    )
+    args = parser.parse_args()
+
     # Check if data directory exists
     data_dir = get_data_path()
     if not data_dir.exists():
@@ -102,5 +274,14 @@ if __name__ == "__main__":
         "cyber_rules": ("jcordon5/cybersecurity-rules", "cyber_rules"),
     }
 
-    for name, (dataset_id, folder_name) in datasets.items():
-        download_dataset(name, dataset_id, folder_name)
+    manifest = DownloadManifest(raw_dir / MANIFEST_FILE)
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        for name, (dataset_id, folder_name) in datasets.items():
+            if args.mirror:
+                executor.submit(
+                    ingest_from_mirror, name, folder_name, Path(args.mirror), manifest
+                )
+            else:
+                executor.submit(
+                    download_dataset, name, dataset_id, folder_name, manifest
+                )
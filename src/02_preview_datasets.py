@@ -11,16 +11,19 @@ and provides a comprehensive overview of each dataset's structure and content.
 Features:
 - Automatic dataset discovery
 - Tabular data preview with pandas formatting
-- Shape and column information
-- Sample data display (first 3 rows)
+- Shape and column information from the Parquet metadata
+- Sample data display (first 3 rows, read from the first row group only)
 
 Author: DSR Portfolio Project Team
 """
 
 import pandas as pd
+import pyarrow.parquet as pq
 from pathlib import Path
 from utils.config import get_raw_path
 
+PREVIEW_ROWS = 3
+
 # Configure pandas for better display
 pd.set_option("display.max_columns", None)
 pd.set_option("display.width", None)
@@ -29,11 +32,16 @@ pd.set_option("display.max_colwidth", 50)
 raw_dir = get_raw_path()
 for folder in raw_dir.iterdir():
     for file in folder.glob("*.parquet"):
-        df = pd.read_parquet(file)
+        # Shape and schema come from the footer; only the first rows are decoded
+        parquet = pq.ParquetFile(file)
+        schema = parquet.schema_arrow
+        head = next(parquet.iter_batches(batch_size=PREVIEW_ROWS), None)
+        df = head.to_pandas() if head is not None else schema.empty_table().to_pandas()
         print(f"\n{'='*50}")
         print(f"FILE: {file}")
-        print(f"SHAPE: {df.shape[0]} rows × {df.shape[1]} columns")
-        print(f"COLUMNS: {list(df.columns)}")
+        print(f"SHAPE: {parquet.metadata.num_rows} rows × {len(schema)} columns")
+        print(f"COLUMNS: {list(schema.names)}")
+        print(f"SCHEMA: {', '.join(f'{f.name}: {f.type}' for f in schema)}")
         print(f"SAMPLE DATA:")
-        print(df.head(3).to_string(index=False, max_colwidth=50))
+        print(df.to_string(index=False, max_colwidth=50))
         print(f"{'='*50}")
@@ -6,131 +6,46 @@ Simple utility to load previously downloaded datasets into memory for processing
 This module provides a unified interface to access all cybersecurity datasets
 and prepare them for RAG pipeline ingestion.
 
+The loading functions live in ``utils.dataset_loader`` and the lazy, cached
+``DatasetRegistry`` in ``utils.dataset_registry`` so that other stages can
+import them; run this script to summarize the downloaded datasets.
+
 Author: DSR Portfolio Project Team
 """
 
-import pandas as pd
-from pathlib import Path
-from typing import Dict, Optional
+import argparse
+import sys
 from utils.logger import setup_logger
-from utils.config import get_raw_path
+from utils.dataset_loader import get_dataset_summary, log_file_summary
+from utils.dataset_registry import load_all_datasets
 
 logger = setup_logger()
 
 
-def load_dataset(dataset_name: str) -> Optional[pd.DataFrame]:
-    """
-    Load a single dataset from the raw data directory.
-
-    Args:
-        dataset_name: Name of the dataset folder (heimdall, ttp_mapping, etc.)
-
-    Returns:
-        DataFrame containing the dataset or None if not found
-    """
-    try:
-        raw_path = get_raw_path()
-        dataset_dir = Path(raw_path) / dataset_name
-
-        if not dataset_dir.exists():
-            logger.error(f"Dataset directory not found: {dataset_dir}")
-            return None
-
-        # Find parquet files in the dataset directory
-        parquet_files = list(dataset_dir.glob("*.parquet"))
-
-        if not parquet_files:
-            logger.error(f"No parquet files found in {dataset_dir}")
-            return None
-
-        # Load the first parquet file (assuming single file per dataset)
-        parquet_file = parquet_files[0]
-        logger.info(f"Loading dataset: {dataset_name} from {parquet_file.name}")
-
-        df = pd.read_parquet(parquet_file)
-        logger.info(f"Loaded {len(df)} records with {len(df.columns)} columns")
-
-        return df
-
-    except Exception as e:
-        logger.error(f"Error loading dataset {dataset_name}: {e}")
-        return None
-
-
-def load_all_datasets() -> Dict[str, pd.DataFrame]:
-    """
-    Load all available cybersecurity datasets.
-
-    Returns:
-        Dictionary mapping dataset names to DataFrames
-    """
-    datasets = {}
-    available_datasets = ["heimdall", "ttp_mapping", "security_attacks", "cyber_rules"]
-
-    logger.info("Loading all cybersecurity datasets...")
-
-    for dataset_name in available_datasets:
-        df = load_dataset(dataset_name)
-        if df is not None:
-            datasets[dataset_name] = df
-            memory_mb = df.memory_usage(deep=True).sum() / 1024**2
-            logger.info(
-                f"Successfully loaded {dataset_name}: {len(df)} records, {memory_mb:.1f} MB"
-            )
-        else:
-            logger.warning(f"Failed to load dataset: {dataset_name}")
-
-    total_records = sum(len(df) for df in datasets.values())
-    total_memory = (
-        sum(df.memory_usage(deep=True).sum() for df in datasets.values()) / 1024**2
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Summarize the downloaded cybersecurity datasets"
     )
-
-    logger.info(
-        f"Dataset loading complete: {len(datasets)}/4 datasets successfully loaded"
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="Load every dataset into memory instead of reading Parquet footers",
     )
-    logger.info(
-        f"Total records: {total_records:,}, Total memory: {total_memory:.1f} MB"
+    parser.add_argument(
+        "--deep-sample",
+        type=int,
+        default=0,
+        metavar="ROWS",
+        help="Estimate pandas memory from a sample of this many rows per dataset",
     )
+    args = parser.parse_args()
 
-    return datasets
-
-
-def get_dataset_summary(datasets: Dict[str, pd.DataFrame]) -> None:
-    """
-    Log summary information for all loaded datasets.
-
-    Args:
-        datasets: Dictionary of dataset name to DataFrame mappings
-    """
-    if not datasets:
-        logger.warning("No datasets available for summary")
-        return
-
-    logger.info("Dataset summary report:")
-
-    total_records = 0
-    total_memory = 0
+    if not args.load:
+        # Metadata-only inventory, no table data is read
+        if not log_file_summary(deep_sample_rows=args.deep_sample):
+            logger.error("No datasets found. Run 01_get_datasets.py first.")
+        sys.exit(0)
 
-    for name, df in datasets.items():
-        memory_mb = df.memory_usage(deep=True).sum() / 1024**2
-        cols_preview = ", ".join(list(df.columns)[:3])
-        if len(df.columns) > 3:
-            cols_preview += f" (+{len(df.columns)-3} more)"
-
-        logger.info(
-            f"  {name}: {len(df):,} records, {len(df.columns)} columns, {memory_mb:.1f} MB"
-        )
-        logger.info(f"    Columns: {cols_preview}")
-
-        total_records += len(df)
-        total_memory += memory_mb
-
-    logger.info(
-        f"Summary totals: {total_records:,} records, {total_memory:.1f} MB across {len(datasets)} datasets"
-    )
-
-
-if __name__ == "__main__":
     # Load all datasets
     datasets = load_all_datasets()
 
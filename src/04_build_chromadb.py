@@ -10,28 +10,41 @@ Author: DSR Portfolio Project Team
 """
 
 import sys
+import json
+import hashlib
+import argparse
 import pandas as pd
+from datetime import datetime
+from time import perf_counter
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple, Union
 
 sys.path.append(".")
 from utils.logger import setup_logger
 from utils.config import get_config
-import chromadb
-from chromadb.config import Settings
+from utils.embeddings import (
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MODEL_NAME,
+    MAX_CHUNK_TOKENS,
+    embed_documents,
+    get_tokenizer,
+)
+from utils.embedding_cache import EmbeddingCache
+from utils.build_report import CollectionBuildStats, peak_rss_mb
+from utils.build_manifest import ManifestWriter
+from utils.collection_aliases import CollectionAliasRegistry, versioned_name
+from utils.chunking import chunk_documents, chunker_id
+from utils.chromadb_client import get_shared_client
+from utils.batching import AdaptiveBatcher
+from utils.near_duplicates import NearDuplicateIndex
+from utils.dataset_loader import get_dataset_files, iter_dataset_batches
+from utils.dataset_registry import get_registry, load_all_datasets
 
 logger = setup_logger()
 
-# Import load_all_datasets function
-import importlib.util
-
-spec = importlib.util.spec_from_file_location(
-    "load_datasets", "src/03_load_datasets.py"
-)
-load_datasets_module = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(load_datasets_module)
-load_all_datasets = load_datasets_module.load_all_datasets
-
 
 class ChromaDBBuilder:
     """Builder class for creating and populating ChromaDB collections."""
@@ -40,9 +53,23 @@ class ChromaDBBuilder:
         """Initialize ChromaDB builder with configuration."""
         self.config = config or get_config()
         self.client = None
+        self.aliases: Optional[CollectionAliasRegistry] = None
         self.collections = {}
+        self.build_version = datetime.now().strftime("%Y%m%d%H%M%S")
+        self.chromadb_path = Path(self.config.CHROMADB_PATH)
+        self.manifest_dir = self.chromadb_path / "manifests"
+        self.dedup_dir = self.chromadb_path / "dedup"
+        self.dedup_threshold: Optional[float] = None
+        self.checkpoint_file = self.chromadb_path / "build_checkpoint.json"
+        self.checkpoint: Dict[str, Dict[str, Any]] = {}
+        self.report_dir = Path("logs")
+        self.build_stats: Dict[str, CollectionBuildStats] = {}
+        self.embedding_cache: Optional[EmbeddingCache] = None
 
-        # Collection configurations for different dataset types
+        # Collection configurations for different dataset types. batch_size
+        # only sizes the first batch; later ones adapt to measured throughput.
+        # An optional "columns" list limits which Parquet columns are read
+        # (text_field plus metadata); by default every column is loaded.
         self.collection_configs = {
             "heimdall": {
                 "name": "cybersec_conversations",
@@ -50,6 +77,7 @@ class ChromaDBBuilder:
                 "description": "Cybersecurity conversation dataset for RAG",
                 "text_field": "assistant",  # Main content field
                 "batch_size": 500,
+                "chunking": True,  # Long answers exceed the embedding model
             },
             "ttp_mapping": {
                 "name": "mitre_techniques",
@@ -71,6 +99,7 @@ class ChromaDBBuilder:
                 "description": "Cybersecurity detection rules",
                 "text_field": "instruction",
                 "batch_size": 200,
+                "chunking": True,
             },
         }
 
@@ -81,12 +110,14 @@ class ChromaDBBuilder:
             logger.info("Connecting to local ChromaDB...")
 
             # Ensure data/chromadb directory exists
-            chromadb_path = Path("data/chromadb")
-            chromadb_path.mkdir(parents=True, exist_ok=True)
+            self.chromadb_path.mkdir(parents=True, exist_ok=True)
 
-            self.client = chromadb.PersistentClient(
-                path=str(chromadb_path), settings=Settings(allow_reset=True)
+            # Share the index with ChromaDBClient instances in this process;
+            # the builder always writes to the local embedded index
+            self.client = get_shared_client(
+                self.config.model_copy(update={"CHROMADB_MODE": "embedded"})
             )
+            self.aliases = CollectionAliasRegistry(self.client)
 
             logger.info("Connected to local ChromaDB successfully")
             return True
@@ -95,26 +126,47 @@ class ChromaDBBuilder:
             logger.error(f"Failed to connect to ChromaDB: {e}")
             return False
 
-    def create_collection(self, dataset_name: str) -> Optional[Any]:
-        """Create a ChromaDB collection for a dataset."""
+    def create_collection(
+        self, dataset_name: str, reset: bool = True, target: Optional[str] = None
+    ) -> Optional[Any]:
+        """
+        Create a ChromaDB collection for a dataset.
+
+        A reset build writes into a new versioned shadow collection
+        (``<name>__v<build_version>``) while readers keep using the collection
+        the ``<name>`` alias points to; see :meth:`promote_collection`.
+
+        Args:
+            dataset_name: Key into ``collection_configs``
+            reset: Build into a fresh shadow collection. When False the
+                collection currently behind the alias is reused for an
+                incremental build.
+            target: Explicit collection to reuse, e.g. the shadow collection
+                of an interrupted build
+        """
         try:
             config = self.collection_configs[dataset_name]
             collection_name = config["name"]
 
-            # Delete existing collection if it exists
-            try:
-                existing = self.client.get_collection(collection_name)
-                self.client.delete_collection(collection_name)
-                logger.info(f"Deleted existing collection: {collection_name}")
-            except:
-                pass  # Collection doesn't exist, which is fine
+            if not reset:
+                target = target or self.aliases.resolve(collection_name)
+                collection = self.client.get_or_create_collection(
+                    name=target, metadata=config["metadata"]
+                )
+                logger.info(
+                    f"Using collection: {target} for {dataset_name} "
+                    f"({collection.count()} existing documents)"
+                )
+                self.collections[dataset_name] = collection
+                return collection
 
-            # Create new collection
+            # Create new shadow collection, the live one stays untouched
+            shadow_name = versioned_name(collection_name, self.build_version)
             collection = self.client.create_collection(
-                name=collection_name, metadata=config["metadata"]
+                name=shadow_name, metadata=config["metadata"]
             )
 
-            logger.info(f"Created collection: {collection_name} for {dataset_name}")
+            logger.info(f"Created collection: {shadow_name} for {dataset_name}")
             self.collections[dataset_name] = collection
             return collection
 
@@ -122,58 +174,518 @@ class ChromaDBBuilder:
             logger.error(f"Failed to create collection for {dataset_name}: {e}")
             return None
 
-    def add_documents_to_collection(self, dataset_name: str, df: pd.DataFrame) -> bool:
-        """Add documents from DataFrame to ChromaDB collection."""
+    def promote_collection(self, dataset_name: str) -> None:
+        """
+        Point the dataset's alias at its freshly built collection.
+
+        The switch is a single upsert in the alias registry, so readers move
+        from the old to the new collection without an empty window. The
+        replaced collection is kept for readers still holding it and removed
+        by the next promotion.
+        """
+        alias = self.collection_configs[dataset_name]["name"]
+        target = self.collections[dataset_name].name
+        previous = self.aliases.resolve(alias)
+
+        if previous != target:
+            self.aliases.set_alias(alias, target)
+            logger.info(f"Switched alias {alias}: {previous} -> {target}")
+
+        for name in self.aliases.versions(alias):
+            if name not in (target, previous):
+                self.client.delete_collection(name)
+                logger.info(f"Deleted superseded collection: {name}")
+
+    def prepare_documents(
+        self, dataset_name: str, df: pd.DataFrame
+    ) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """
+        Prepare documents, metadata and ids column-wise from a DataFrame.
+
+        Filtering, stripping and metadata truncation run as pandas string
+        operations on whole columns; only the final assembly of the metadata
+        dicts touches individual rows.
+
+        Args:
+            dataset_name: Key into ``collection_configs``
+            df: Raw dataset DataFrame
+
+        Returns:
+            Tuple of (documents, metadatas, ids) in DataFrame order
+        """
+        text_field = self.collection_configs[dataset_name]["text_field"]
+        if text_field not in df.columns:
+            return [], [], []
+
+        # Main text content: non-null, stripped, only meaningful texts
+        texts = df[text_field]
+        texts = texts[texts.notna()].astype(str).str.strip()
+        texts = texts[texts.str.len() > 10]
+        index = texts.index
+
+        # Metadata (all other fields), NaN cells become None and are dropped
+        metadata_columns = {}
+        for col in df.columns:
+            if col == text_field:
+                continue
+            values = df[col].loc[index]
+            truncated = values.astype(str).str[:200]  # Limit metadata length
+            metadata_columns[col] = truncated.where(values.notna(), None).tolist()
+
+        names = list(metadata_columns)
+        rows = zip(*metadata_columns.values()) if names else repeat(())
+        metadatas = []
+        for idx, row in zip(index, rows):
+            metadata = {k: v for k, v in zip(names, row) if v is not None}
+            metadata["dataset"] = dataset_name
+            metadata["original_index"] = int(idx)
+            metadatas.append(metadata)
+
+        documents = texts.tolist()
+        ids = [f"{dataset_name}_{idx}" for idx in index]
+        return documents, metadatas, ids
+
+    def prepare_documents_rowwise(
+        self, dataset_name: str, df: pd.DataFrame
+    ) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """
+        Reference row-by-row preparation, kept for benchmarking.
+
+        Produces the same output as :meth:`prepare_documents` using
+        ``df.iterrows()``.
+        """
+        text_field = self.collection_configs[dataset_name]["text_field"]
+
+        documents = []
+        metadatas = []
+        ids = []
+
+        for idx, row in df.iterrows():
+            # Main text content
+            if text_field in row and pd.notna(row[text_field]):
+                text = str(row[text_field]).strip()
+                if len(text) > 10:  # Only add meaningful texts
+                    documents.append(text)
+
+                    # Metadata (all other fields)
+                    metadata = {}
+                    for col in df.columns:
+                        if col != text_field and pd.notna(row[col]):
+                            metadata[col] = str(row[col])[:200]  # Limit metadata length
+
+                    metadata["dataset"] = dataset_name
+                    metadata["original_index"] = int(idx)
+                    metadatas.append(metadata)
+
+                    # Unique ID
+                    ids.append(f"{dataset_name}_{idx}")
+
+        return documents, metadatas, ids
+
+    @staticmethod
+    def content_hash(document: str, metadata: Dict[str, Any]) -> str:
+        """Return a stable hash of a document and its metadata."""
+        payload = json.dumps([document, metadata], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load_manifest(
+        self, collection_name: str, chunker: Optional[str] = None
+    ) -> Optional[Dict[str, str]]:
+        """
+        Load the content hash manifest of a collection.
+
+        Args:
+            collection_name: Collection the manifest belongs to
+            chunker: Current :func:`chunker_id` of the collection, None if it
+                is not chunked
+
+        Returns:
+            Mapping of document id to content hash, or None if no manifest
+            exists or it was written with a different chunker
+        """
+        manifest_file = self.manifest_dir / f"{collection_name}.json"
+        if not manifest_file.exists():
+            return None
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("chunker") != chunker:
+            logger.warning(
+                f"Manifest of {collection_name} was chunked by {data.get('chunker')}, "
+                f"now {chunker}; rewriting every document"
+            )
+            return None
+        return data["documents"]
+
+    def save_manifest(
+        self,
+        collection_name: str,
+        manifest: Dict[str, str],
+        chunker: Optional[str] = None,
+    ) -> None:
+        """Atomically write the content hash manifest of a collection."""
+        writer = self.manifest_writer(collection_name, chunker)
+        writer.update(manifest.items())
+        writer.commit()
+
+    def manifest_writer(
+        self, collection_name: str, chunker: Optional[str] = None
+    ) -> ManifestWriter:
+        """Start writing a new manifest of a collection entry by entry."""
+        return ManifestWriter(
+            self.manifest_dir / f"{collection_name}.json", collection_name, chunker
+        )
+
+    def save_folded(self, collection_name: str, folded: Dict[str, str]) -> None:
+        """Atomically write which ids were folded into which representative."""
+        self.dedup_dir.mkdir(parents=True, exist_ok=True)
+        folded_file = self.dedup_dir / f"{collection_name}.json"
+        tmp_file = folded_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "collection": collection_name,
+                    "threshold": self.dedup_threshold,
+                    "folded": folded,
+                },
+                f,
+            )
+        tmp_file.replace(folded_file)
+
+    def load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        """Load the per-collection build checkpoint, empty if none exists."""
+        if not self.checkpoint_file.exists():
+            return {}
+        with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def update_checkpoint(self, collection_name: str, **state: Any) -> None:
+        """
+        Record build progress of a collection and write the checkpoint file.
+
+        The file is replaced atomically so a crash never leaves it half written.
+        """
+        self.checkpoint.setdefault(collection_name, {}).update(state)
+        self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.checkpoint_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.checkpoint, f, indent=2)
+        tmp_file.replace(self.checkpoint_file)
+
+    def iter_batches(
+        self,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+        batcher: AdaptiveBatcher,
+        executor: Optional[Executor] = None,
+        prefetch: int = 1,
+    ) -> Iterator[Tuple[List[str], List[Dict[str, Any]], List[str], list]]:
+        """
+        Split prepared documents into batches and embed them, optionally ahead.
+
+        Batch boundaries come from ``batcher``, which sizes them by characters
+        and adapts to the latencies the caller records. With an executor, up to
+        ``prefetch`` batches are embedded in worker processes while the caller
+        writes the current batch, so embedding and storage writes overlap.
+        With an embedding cache, only texts missing from the cache are
+        embedded. Without either, each batch is embedded in this process
+        before it is yielded, so embedding time is measured apart from the
+        Chroma write instead of being spent inside ``add``.
+
+        Yields:
+            Tuples of (documents, metadatas, ids, embeddings)
+        """
+        cache = self.embedding_cache
+        batcher.set_documents(documents)
+        next_start = 0
+        pending = deque()
+
+        def submit_next() -> None:
+            nonlocal next_start
+            if next_start >= len(documents):
+                return
+            start, next_start = next_start, batcher.next_end(next_start)
+            end = next_start
+            batch = documents[start:end]
+            cached = cache.get_many(batch) if cache else [None] * len(batch)
+            missing = list(dict.fromkeys(t for t, e in zip(batch, cached) if e is None))
+            future = None
+            if executor and missing:
+                future = executor.submit(embed_documents, missing)
+            pending.append((start, end, cached, missing, future))
+
+        for _ in range(max(1, prefetch)):
+            submit_next()
+        while pending:
+            start, end, cached, missing, future = pending.popleft()
+            submit_next()
+
+            computed = []
+            if missing:
+                computed = future.result() if future else embed_documents(missing)
+                if cache:
+                    cache.put_many(missing, computed)
+            by_text = dict(zip(missing, computed))
+            embeddings = [
+                by_text[text] if embedding is None else embedding
+                for text, embedding in zip(documents[start:end], cached)
+            ]
+            yield documents[start:end], metadatas[start:end], ids[start:end], embeddings
+
+    def add_documents_to_collection(
+        self,
+        dataset_name: str,
+        df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        incremental: bool = False,
+        executor: Optional[Executor] = None,
+        prefetch: int = 1,
+        resume: bool = False,
+    ) -> bool:
+        """
+        Add documents from DataFrame to ChromaDB collection.
+
+        ``df`` may also be an iterable of DataFrame chunks (see
+        ``iter_dataset_batches``); each chunk is prepared, embedded and written
+        before the next one is read, so memory is bounded by the chunk size.
+        Collections configured with ``chunking`` index token windows of each
+        document that reference it through ``parent_id``. With
+        ``self.dedup_threshold`` set, near-duplicate documents are folded into
+        the first similar document with the same metadata before chunking and
+        recorded in ``data/chromadb/dedup/<collection>.json``.
+
+        In incremental mode only documents whose content hash differs from the
+        collection manifest are upserted, and ids that are no longer present
+        in the dataset are deleted from the collection. Embeddings are computed
+        outside Chroma (see ``iter_batches``) and passed to it precomputed, so
+        ``embed_seconds`` and ``write_seconds`` are timed separately; with an
+        ``executor``, ``embed_seconds`` is the time spent waiting on the
+        workers for each batch's embeddings.
+
+        The content hash manifest is written to disk chunk by chunk. Memory
+        that still grows with the dataset: in incremental mode the previous
+        manifest and the ids it holds that were not seen yet, and with
+        deduplication the near-duplicate index and the folded id map.
+
+        Progress is checkpointed after every written batch. With ``resume``,
+        prepared documents up to the checkpointed position are skipped.
+        Timings are recorded in ``self.build_stats[dataset_name]``.
+        """
+        started = perf_counter()
+        manifest_writer = None
         try:
             config = self.collection_configs[dataset_name]
+            stats = CollectionBuildStats(config["name"])
+            stats.sample_rss()
+            self.build_stats[dataset_name] = stats
             collection = self.collections[dataset_name]
-            text_field = config["text_field"]
             batch_size = config["batch_size"]
+            batcher = AdaptiveBatcher(
+                initial_docs=batch_size,
+                target_seconds=self.config.CHROMADB_BATCH_TARGET_SECONDS,
+                max_docs=self.client.get_max_batch_size(),
+            )
+            chunks = [df] if isinstance(df, pd.DataFrame) else df
+            dedup = (
+                NearDuplicateIndex(self.dedup_threshold)
+                if self.dedup_threshold
+                else None
+            )
+            folded = {}
+            tokenizer = get_tokenizer() if config.get("chunking") else None
+            if config.get("chunking") and tokenizer is None:
+                logger.warning(
+                    f"Embedding model tokenizer unavailable, chunking {config['name']} "
+                    "by approximate word counts"
+                )
+            chunk_tokens = min(self.config.CHROMADB_CHUNK_TOKENS, MAX_CHUNK_TOKENS)
+            chunk_overlap = self.config.CHROMADB_CHUNK_OVERLAP
+            chunker = (
+                chunker_id(tokenizer, chunk_tokens, chunk_overlap)
+                if config.get("chunking")
+                else None
+            )
+
+            state = self.checkpoint.get(config["name"], {}) if resume else {}
+            skip = state.get("written", 0)
+            if skip and state.get("chunker") != chunker:
+                # Chunk ids and positions differ, so nothing written can be kept
+                logger.warning(
+                    f"Checkpoint of {config['name']} was chunked by "
+                    f"{state.get('chunker')}, now {chunker}; rebuilding it"
+                )
+                stored = collection.get(include=[])["ids"]
+                for i in range(0, len(stored), batch_size):
+                    collection.delete(ids=stored[i : i + batch_size])
+                skip = 0
+            if skip:
+                logger.info(
+                    f"Resuming {config['name']} after {skip} documents "
+                    f"(last id {state['last_id']})"
+                )
+            else:
+                self.update_checkpoint(
+                    config["name"],
+                    written=0,
+                    last_id=None,
+                    complete=False,
+                    target=collection.name,
+                    chunker=chunker,
+                )
+
+            manifest = {}
+            if incremental:
+                manifest = self.load_manifest(config["name"], chunker)
+                if manifest is None or len(manifest) != collection.count():
+                    # Manifest missing or out of sync: treat stored documents as stale
+                    manifest = dict.fromkeys(collection.get(include=[])["ids"], "")
+            # Batches written just before a crash may be written again on resume
+            write = collection.upsert if incremental or resume else collection.add
+
+            # Ids of the old manifest not seen in the dataset yet
+            stale = set(manifest)
+            manifest_writer = self.manifest_writer(config["name"], chunker)
+            total_docs = 0
+            batch_num = 0
+            position = 0  # Prepared documents handled so far, in dataset order
+            read_started = perf_counter()
+            for chunk in chunks:
+                stats.read_seconds += perf_counter() - read_started
+
+                # Prepare documents
+                prepare_started = perf_counter()
+                documents, metadatas, ids = self.prepare_documents(dataset_name, chunk)
+                if dedup:
+                    dedup_started = perf_counter()
+                    chars = sum(len(d) for d in documents)
+                    documents, metadatas, ids, chunk_folded = dedup.filter(
+                        documents, metadatas, ids
+                    )
+                    folded.update(chunk_folded)
+                    stats.duplicates += len(chunk_folded)
+                    stats.duplicate_chars += chars - sum(len(d) for d in documents)
+                    stats.dedup_seconds += perf_counter() - dedup_started
+                if config.get("chunking"):
+                    documents, metadatas, ids = chunk_documents(
+                        documents,
+                        metadatas,
+                        ids,
+                        chunk_tokens,
+                        chunk_overlap,
+                        tokenizer,
+                    )
+                hashes = [self.content_hash(d, m) for d, m in zip(documents, metadatas)]
+                manifest_writer.update(zip(ids, hashes))
+                stale.difference_update(ids)
+
+                # Skip documents already committed before the checkpoint
+                done = min(max(skip - position, 0), len(ids))
+                if (
+                    done
+                    and position + done == skip
+                    and ids[done - 1] != state["last_id"]
+                ):
+                    raise ValueError(
+                        f"checkpoint does not match dataset at position {skip}, "
+                        "rebuild without --resume"
+                    )
+                position += done
+                documents, metadatas = documents[done:], metadatas[done:]
+                ids, hashes = ids[done:], hashes[done:]
+                positions = list(range(position, position + len(ids)))
+                position += len(ids)
+
+                if incremental:
+                    changed = [
+                        i
+                        for i, (doc_id, content_hash) in enumerate(zip(ids, hashes))
+                        if manifest.get(doc_id) != content_hash
+                    ]
+                    documents = [documents[i] for i in changed]
+                    metadatas = [metadatas[i] for i in changed]
+                    ids = [ids[i] for i in changed]
+                    positions = [positions[i] for i in changed]
+                stats.prepare_seconds += perf_counter() - prepare_started
+
+                # Add documents in batches
+                total_docs += len(documents)
+                logger.info(
+                    f"Adding {len(documents)} documents to {config['name']} collection"
+                )
+
+                batches = self.iter_batches(
+                    documents, metadatas, ids, batcher, executor, prefetch
+                )
+                written = 0
+                batch_started = perf_counter()
+                for batch_docs, batch_metadata, batch_ids, embeddings in batches:
+                    embedded = perf_counter()
+                    write(
+                        documents=batch_docs,
+                        metadatas=batch_metadata,
+                        ids=batch_ids,
+                        embeddings=embeddings,
+                    )
+                    stats.add_batch(
+                        len(batch_ids),
+                        embedded - batch_started,
+                        perf_counter() - embedded,
+                    )
+                    stats.sample_rss()
+                    batcher.record(
+                        len(batch_ids),
+                        sum(len(d) for d in batch_docs),
+                        stats.batch_latencies[-1],
+                    )
+                    written += len(batch_ids)
+                    self.update_checkpoint(
+                        config["name"],
+                        written=positions[written - 1] + 1,
+                        last_id=batch_ids[-1],
+                    )
+
+                    batch_num += 1
+                    logger.info(
+                        f"Processed batch {batch_num}: {len(batch_docs)} documents added"
+                    )
+                    batch_started = perf_counter()
+
+                read_started = perf_counter()
+
+            if incremental:
+                removed = sorted(stale)
+                for i in range(0, len(removed), batch_size):
+                    collection.delete(ids=removed[i : i + batch_size])
+                logger.info(
+                    f"Incremental update of {config['name']}: {total_docs} new or "
+                    f"changed, {len(removed)} removed, "
+                    f"{manifest_writer.count - total_docs} unchanged"
+                )
 
-            # Prepare documents
-            documents = []
-            metadatas = []
-            ids = []
-
-            for idx, row in df.iterrows():
-                # Main text content
-                if text_field in row and pd.notna(row[text_field]):
-                    text = str(row[text_field]).strip()
-                    if len(text) > 10:  # Only add meaningful texts
-                        documents.append(text)
-
-                        # Metadata (all other fields)
-                        metadata = {}
-                        for col in df.columns:
-                            if col != text_field and pd.notna(row[col]):
-                                metadata[col] = str(row[col])[
-                                    :200
-                                ]  # Limit metadata length
-
-                        metadata["dataset"] = dataset_name
-                        metadata["original_index"] = int(idx)
-                        metadatas.append(metadata)
-
-                        # Unique ID
-                        ids.append(f"{dataset_name}_{idx}")
-
-            # Add documents in batches
-            total_docs = len(documents)
-            logger.info(f"Adding {total_docs} documents to {config['name']} collection")
-
-            for i in range(0, total_docs, batch_size):
-                end_idx = min(i + batch_size, total_docs)
-                batch_docs = documents[i:end_idx]
-                batch_metadata = metadatas[i:end_idx]
-                batch_ids = ids[i:end_idx]
-
-                collection.add(
-                    documents=batch_docs, metadatas=batch_metadata, ids=batch_ids
+            manifest_writer.commit()
+            if dedup:
+                self.save_folded(config["name"], folded)
+            self.update_checkpoint(config["name"], written=position, complete=True)
+            stats.total_seconds = perf_counter() - started
+            stats.sample_rss()
+            stats.batch_chars = batcher.char_budget
+            stats.settled_batch_docs = batcher.settled_docs
+            stats.written_chars = batcher.total_chars
+            stats.vector_bytes = EMBEDDING_DIMENSIONS * 4
+
+            if dedup:
+                savings = stats.dedup_savings()
+                logger.info(
+                    f"Folded {stats.duplicates} near duplicates in {config['name']} "
+                    f"(threshold {self.dedup_threshold}): "
+                    f"~{savings['estimated_index_mb_saved']} MB index and "
+                    f"~{savings['estimated_seconds_saved']} s build time saved"
                 )
 
-                batch_num = i // batch_size + 1
+            if batcher.char_budget:
                 logger.info(
-                    f"Processed batch {batch_num}: {len(batch_docs)} documents added"
+                    f"Adaptive batching for {config['name']} settled at "
+                    f"~{batcher.char_budget:,.0f} characters "
+                    f"(~{batcher.settled_docs} documents) per batch"
                 )
 
             logger.info(
@@ -183,32 +695,143 @@ class ChromaDBBuilder:
 
         except Exception as e:
             logger.error(f"Failed to add documents for {dataset_name}: {e}")
+            if manifest_writer is not None:
+                manifest_writer.abort()
             return False
 
-    def build_vector_database(self) -> Dict[str, Any]:
-        """Build complete ChromaDB vector database from all datasets."""
+    def build_vector_database(
+        self,
+        incremental: bool = False,
+        workers: Optional[int] = None,
+        use_embedding_cache: Optional[bool] = None,
+        streaming: bool = False,
+        batch_mb: Optional[float] = None,
+        resume: bool = False,
+        report_path: Optional[Path] = None,
+        use_processed: Optional[bool] = None,
+        dedup: Optional[bool] = None,
+        dedup_threshold: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build complete ChromaDB vector database from all datasets.
+
+        Args:
+            incremental: Reuse existing collections and only write the
+                difference against each collection's manifest instead of
+                deleting and re-embedding everything.
+            workers: Number of embedding worker processes. Defaults to
+                ``CHROMADB_BUILD_WORKERS``; 1 embeds in-process.
+            use_embedding_cache: Reuse embeddings of previously seen texts from
+                ``EMBEDDING_CACHE_DIR``. Defaults to ``EMBEDDING_CACHE_ENABLED``.
+            streaming: Read each dataset in Parquet chunks of about
+                ``batch_mb`` megabytes instead of loading all datasets first.
+            batch_mb: Chunk budget for streaming. Defaults to
+                ``CHROMADB_STREAM_BATCH_MB``.
+            resume: Continue an interrupted build from the checkpoint file,
+                skipping completed collections and committed batches.
+            report_path: Where to write the JSON performance report. Defaults
+                to a timestamped file in ``logs/``.
+            use_processed: Load the memory-mapped processed snapshots from
+                ``PROCESSED_DIR`` (built on first use) instead of the raw
+                Parquet files. Defaults to ``DATASET_PROCESSED_SNAPSHOTS``;
+                ignored when streaming.
+            dedup: Fold near-duplicate documents with matching metadata
+                before indexing. Lossy, so off unless enabled here or by
+                ``CHROMADB_DEDUP_ENABLED``.
+            dedup_threshold: Estimated Jaccard similarity of word shingles at
+                which documents are folded. Defaults to
+                ``CHROMADB_DEDUP_THRESHOLD``.
+
+        Returns:
+            Per-dataset results plus a ``summary`` dict and a ``report`` dict
+            with per-collection timings, throughput and peak RSS
+        """
+        workers = workers or self.config.CHROMADB_BUILD_WORKERS
+        if use_embedding_cache is None:
+            use_embedding_cache = self.config.EMBEDDING_CACHE_ENABLED
+        if use_processed is None:
+            use_processed = self.config.DATASET_PROCESSED_SNAPSHOTS
+        if dedup is None:
+            dedup = self.config.CHROMADB_DEDUP_ENABLED
+        self.dedup_threshold = (
+            (dedup_threshold or self.config.CHROMADB_DEDUP_THRESHOLD) if dedup else None
+        )
         logger.info("Starting ChromaDB vector database build process")
+        started_at = datetime.now()
+        started = perf_counter()
 
         # Connect to ChromaDB
         if not self.connect_to_chromadb():
             return {"success": False, "error": "ChromaDB connection failed"}
 
         # Load datasets
-        logger.info("Loading cybersecurity datasets for vector database")
-        datasets = load_all_datasets()
+        load_started = perf_counter()
+        if streaming:
+            batch_mb = batch_mb or self.config.CHROMADB_STREAM_BATCH_MB
+            logger.info(f"Streaming cybersecurity datasets in ~{batch_mb} MB chunks")
+            datasets = {
+                name: iter_dataset_batches(name, batch_mb, config.get("columns"))
+                for name, config in self.collection_configs.items()
+                if get_dataset_files(name)
+            }
+        elif use_processed:
+            logger.info("Loading processed dataset snapshots for vector database")
+            registry = get_registry()
+            datasets = registry.materialize(
+                {
+                    name: registry.processed(
+                        name, config["text_field"], config.get("columns")
+                    )
+                    for name, config in self.collection_configs.items()
+                }
+            )
+        else:
+            logger.info("Loading cybersecurity datasets for vector database")
+            datasets = load_all_datasets(
+                {
+                    name: config.get("columns")
+                    for name, config in self.collection_configs.items()
+                }
+            )
 
         if not datasets:
             return {"success": False, "error": "No datasets available"}
+        load_seconds = perf_counter() - load_started
+
+        if use_embedding_cache:
+            self.embedding_cache = EmbeddingCache(
+                Path(self.config.EMBEDDING_CACHE_DIR), EMBEDDING_MODEL_NAME
+            )
+            logger.info(
+                f"Using embedding cache at {self.embedding_cache.path} "
+                f"({len(self.embedding_cache.index)} cached embeddings)"
+            )
+
+        self.checkpoint = self.load_checkpoint() if resume else {}
 
         # Build collections
         results = {}
         total_documents = 0
 
+        # Embedding runs in worker processes while this process writes to
+        # Chroma; a single writer keeps the persistent store consistent.
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        if executor:
+            logger.info(f"Embedding with {workers} worker processes")
+
         for dataset_name, df in datasets.items():
             logger.info(f"Processing {dataset_name} dataset for vector indexing")
 
-            # Create collection
-            collection = self.create_collection(dataset_name)
+            state = self.checkpoint.get(
+                self.collection_configs[dataset_name]["name"], {}
+            )
+
+            # Create collection, keeping it if there is progress to resume
+            collection = self.create_collection(
+                dataset_name,
+                reset=not (incremental or state),
+                target=state.get("target"),
+            )
             if not collection:
                 results[dataset_name] = {
                     "success": False,
@@ -217,12 +840,25 @@ class ChromaDBBuilder:
                 continue
 
             # Add documents
-            success = self.add_documents_to_collection(dataset_name, df)
+            if state.get("complete"):
+                logger.info(f"Skipping {dataset_name}: completed before resume")
+                success = True
+            else:
+                success = self.add_documents_to_collection(
+                    dataset_name,
+                    df,
+                    incremental,
+                    executor,
+                    prefetch=2 * workers,
+                    resume=bool(state),
+                )
             if success:
+                self.promote_collection(dataset_name)
                 doc_count = collection.count()
                 results[dataset_name] = {
                     "success": True,
                     "collection_name": self.collection_configs[dataset_name]["name"],
+                    "target_collection": collection.name,
                     "documents": doc_count,
                 }
                 total_documents += doc_count
@@ -233,33 +869,83 @@ class ChromaDBBuilder:
                     "error": "Document insertion failed",
                 }
 
+        if executor:
+            executor.shutdown()
+
         # Summary
         successful = sum(1 for r in results.values() if r["success"])
         results["summary"] = {
-            "total_collections": len(results) - 1,  # Exclude summary itself
+            "total_collections": len(results),
             "successful_collections": successful,
             "total_documents": total_documents,
-            "chromadb_path": "data/chromadb",
+            "chromadb_path": str(self.chromadb_path),
+            "mode": "incremental" if incremental else "full",
+            "streaming": streaming,
+            "processed_snapshots": use_processed and not streaming,
+            "resumed": resume,
+            "workers": workers,
+            "dedup_threshold": self.dedup_threshold,
+            "duplicates_folded": sum(
+                stats.duplicates for stats in self.build_stats.values()
+            ),
+            "embedding_cache": (
+                self.embedding_cache.stats() if self.embedding_cache else None
+            ),
         }
 
         logger.info(
             f"Vector database build completed: {successful}/{len(results)-1} collections, {total_documents} total documents"
         )
+
+        # Performance report
+        report = {
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "total_seconds": round(perf_counter() - started, 3),
+            "load_seconds": round(load_seconds, 3),
+            # Builder process only; child processes such as embedding workers
+            # are reported separately, once the pool has shut them down
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "peak_child_rss_mb": round(peak_rss_mb(children=True), 1),
+            **results["summary"],
+            "collections": {
+                name: stats.to_dict() for name, stats in self.build_stats.items()
+            },
+        }
+        report_path = report_path or self.report_dir / (
+            f"chromadb_build_report_{started_at:%Y%m%d_%H%M%S}.json"
+        )
+        self.write_report(report, Path(report_path))
+        results["summary"]["report_path"] = str(report_path)
+        results["report"] = report
         return results
 
+    def write_report(self, report: Dict[str, Any], report_path: Path) -> None:
+        """Write the build performance report as JSON."""
+        try:
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"Build performance report written to {report_path}")
+        except Exception as e:
+            logger.error(f"Failed to write build report {report_path}: {e}")
+
     def test_search(self) -> None:
         """Test vector search functionality."""
         try:
             logger.info("Testing vector search functionality")
 
             # Test search on Heimdall collection
-            heimdall_collection = self.client.get_collection("cybersec_conversations")
+            heimdall_collection = self.client.get_collection(
+                self.aliases.resolve("cybersec_conversations")
+            )
 
             # Sample query
             query = "How to detect malware in network traffic?"
             logger.info(f"Executing test query: '{query}'")
 
-            results = heimdall_collection.query(query_texts=[query], n_results=3)
+            results = heimdall_collection.query(
+                query_texts=[query], n_results=3, include=["documents", "distances"]
+            )
 
             # Log results
             for i, (doc, distance) in enumerate(
@@ -279,12 +965,85 @@ class ChromaDBBuilder:
 
 def main():
     """Main function to build ChromaDB vector database."""
+    parser = argparse.ArgumentParser(description="Build the ChromaDB vector database")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only upsert new or changed documents and delete removed ones",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Embedding worker processes (default: CHROMADB_BUILD_WORKERS)",
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help="Embed every document instead of reusing cached embeddings",
+    )
+    parser.add_argument(
+        "--no-processed",
+        action="store_true",
+        help="Load the raw Parquet files instead of the processed snapshots",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Fold near-duplicate documents with matching metadata before indexing",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Index near-duplicate documents even if CHROMADB_DEDUP_ENABLED is set",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Near-duplicate similarity (default: CHROMADB_DEDUP_THRESHOLD)",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Read datasets in Parquet chunks instead of loading them fully",
+    )
+    parser.add_argument(
+        "--batch-mb",
+        type=float,
+        default=None,
+        help="Chunk budget in MB for --streaming (default: CHROMADB_STREAM_BATCH_MB)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted build from its checkpoint",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Path of the JSON performance report (default: logs/)",
+    )
+    args = parser.parse_args()
+
     logger.info("ChromaDB vector database builder started")
 
     builder = ChromaDBBuilder()
 
     # Build the vector database
-    results = builder.build_vector_database()
+    results = builder.build_vector_database(
+        incremental=args.incremental,
+        workers=args.workers,
+        use_embedding_cache=False if args.no_embedding_cache else None,
+        streaming=args.streaming,
+        batch_mb=args.batch_mb,
+        resume=args.resume,
+        report_path=args.report,
+        use_processed=False if args.no_processed else None,
+        dedup=True if args.dedup else False if args.no_dedup else None,
+        dedup_threshold=args.dedup_threshold,
+    )
 
     # Log results summary
     if "summary" in results:
@@ -294,10 +1053,16 @@ def main():
         )
         logger.info(f"Total documents indexed: {summary['total_documents']:,}")
         logger.info(f"ChromaDB location: {summary['chromadb_path']}")
+        if summary.get("embedding_cache"):
+            cache_stats = summary["embedding_cache"]
+            logger.info(
+                f"Embedding cache: {cache_stats['hits']:,} hits, "
+                f"{cache_stats['misses']:,} misses ({cache_stats['hit_rate']:.1%})"
+            )
 
     # Log detailed results
     for dataset, result in results.items():
-        if dataset != "summary":
+        if dataset not in ("summary", "report"):
             if result["success"]:
                 logger.info(
                     f"Collection {result['collection_name']}: {result['documents']} documents from {dataset}"
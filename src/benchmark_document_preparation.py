@@ -0,0 +1,112 @@
+# \!/usr/bin/env python3
+"""
+Document Preparation Benchmark for the ChromaDB Builder.
+
+Compares the row-by-row preparation path (``df.iterrows()``) with the
+column-wise path used by ``ChromaDBBuilder.add_documents_to_collection``
+on each of the four cybersecurity datasets. Both paths must produce
+identical documents, metadata and ids; only the timing differs.
+
+Usage:
+    python src/benchmark_document_preparation.py [--repeat N]
+
+Author: DSR Portfolio Project Team
+"""
+
+import sys
+import argparse
+import importlib.util
+from time import perf_counter
+from typing import Callable, Dict, Any
+
+sys.path.append(".")
+from utils.logger import setup_logger
+from utils.dataset_registry import load_all_datasets
+
+logger = setup_logger()
+
+spec = importlib.util.spec_from_file_location(
+    "build_chromadb", "src/04_build_chromadb.py"
+)
+build_chromadb_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(build_chromadb_module)
+ChromaDBBuilder = build_chromadb_module.ChromaDBBuilder
+
+
+def time_preparation(prepare: Callable, dataset_name: str, df, repeat: int) -> float:
+    """Return the best wall-clock time in seconds over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        prepare(dataset_name, df)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def run_benchmark(repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark row-wise and column-wise preparation on all datasets.
+
+    Args:
+        repeat: Number of timed runs per path, the best run is reported
+
+    Returns:
+        Dictionary mapping dataset names to timing results
+    """
+    builder = ChromaDBBuilder()
+    datasets = load_all_datasets()
+    results = {}
+
+    for dataset_name, df in datasets.items():
+        rowwise = builder.prepare_documents_rowwise(dataset_name, df)
+        columnar = builder.prepare_documents(dataset_name, df)
+        if rowwise != columnar:
+            logger.error(f"{dataset_name}: column-wise output differs from row-wise")
+
+        rowwise_s = time_preparation(
+            builder.prepare_documents_rowwise, dataset_name, df, repeat
+        )
+        columnar_s = time_preparation(
+            builder.prepare_documents, dataset_name, df, repeat
+        )
+
+        results[dataset_name] = {
+            "rows": len(df),
+            "documents": len(columnar[0]),
+            "rowwise_seconds": rowwise_s,
+            "columnar_seconds": columnar_s,
+            "speedup": rowwise_s / columnar_s if columnar_s else float("inf"),
+            "identical": rowwise == columnar,
+        }
+        logger.info(
+            f"{dataset_name}: {len(df):,} rows, row-wise {rowwise_s:.3f}s, "
+            f"column-wise {columnar_s:.3f}s ({results[dataset_name]['speedup']:.1f}x)"
+        )
+
+    return results
+
+
+def main():
+    """Main function for standalone execution."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed runs per preparation path"
+    )
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat)
+
+    print(
+        f"\n{'dataset':<18}{'rows':>10}{'row-wise':>12}{'columnar':>12}{'speedup':>10}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<18}{result['rows']:>10,}"
+            f"{result['rowwise_seconds']:>11.3f}s{result['columnar_seconds']:>11.3f}s"
+            f"{result['speedup']:>9.1f}x"
+            + ("" if result["identical"] else "  (output mismatch)")
+        )
+
+
+if __name__ == "__main__":
+    main()
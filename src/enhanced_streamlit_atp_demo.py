@@ -142,9 +142,10 @@ def main():
     if st.sidebar.button("Test ChromaDB Connection"):
         try:
             import chromadb
+            from utils.collection_aliases import CollectionAliasRegistry
 
             client = chromadb.PersistentClient(path="./data/chromadb")
-            collections = [c.name for c in client.list_collections()]
+            collections = CollectionAliasRegistry(client).collection_names()
             st.sidebar.success(f"Connected! Collections: {', '.join(collections)}")
         except Exception as e:
             st.sidebar.error(f"Connection failed: {e}")
@@ -7,11 +7,14 @@ from typing import Dict, List, Any
 from random import choice, randint, uniform, shuffle
 
 sys.path.append(".")
+from utils.collection_aliases import CollectionAliasRegistry
 
 
 class RealisticATPGenerator:
     def __init__(self, chromadb_path="./data/chromadb"):
         self.base_timestamp = datetime.now()
+        self._collection_client = None
+        self._collections = {}
         self.attack_chains = {
             "apt29_cozy_bear": {
                 "initial_access": [
@@ -765,14 +768,27 @@ class RealisticATPGenerator:
         except:
             return None
 
+    def get_collection(self, client, name):
+        # Follow the alias once per client so rebuilds never expose a missing
+        # collection; every later technique reuses the resolved handle
+        if self._collection_client is not client:
+            self._collection_client = client
+            self._collections = {}
+        if name not in self._collections:
+            target = CollectionAliasRegistry(client).resolve(name)
+            self._collections[name] = client.get_collection(target)
+        return self._collections[name]
+
     def calculate_detection_confidence(self, technique, client):
         if not client:
             return 0.5
 
         try:
-            collection = client.get_collection("mitre_techniques")
+            collection = self.get_collection(client, "mitre_techniques")
             query = f"{technique['name']} {technique['tactic']} {' '.join(technique['indicators'])}"
-            results = collection.query(query_texts=[query], n_results=3)
+            results = collection.query(
+                query_texts=[query], n_results=3, include=["distances"]
+            )
 
             if results and results["distances"][0]:
                 avg_distance = sum(results["distances"][0]) / len(
@@ -790,11 +806,18 @@ class RealisticATPGenerator:
             return 0.3
 
         try:
-            collection = client.get_collection("detection_rules")
+            collection = self.get_collection(client, "detection_rules")
             query = f"{technique['process']} {technique['cmd']}"
-            results = collection.query(query_texts=[query], n_results=3)
-
-            matches = len(results["documents"][0]) if results else 0
+            results = collection.query(
+                query_texts=[query], n_results=3, include=["metadatas"]
+            )
+
+            # Long rules are indexed as several chunks; count each rule once
+            rules = set()
+            if results:
+                for doc_id, metadata in zip(results["ids"][0], results["metadatas"][0]):
+                    rules.add((metadata or {}).get("parent_id", doc_id))
+            matches = len(rules)
             if matches >= 2:
                 return round(uniform(0.05, 0.15), 2)
             elif matches == 1:
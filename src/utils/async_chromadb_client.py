@@ -0,0 +1,180 @@
+"""
+Asyncio ChromaDB client for the RAG Cybersecurity Classification System.
+Runs the calls of a ChromaDBClient in a bounded thread pool so coroutines can
+overlap retrieval latency over the process-wide shared Chroma connection.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from loguru import logger
+
+from .bulk_writer import BulkWriteReport
+from .chromadb_client import ChromaDBClient, batch_texts, split_hits
+from .config import get_config
+
+T = TypeVar("T")
+
+
+class AsyncChromaDBClient:
+    """Asyncio interface to ChromaDB with a bounded number of in-flight calls."""
+
+    def __init__(
+        self,
+        config=None,
+        max_concurrency: Optional[int] = None,
+        client: Optional[ChromaDBClient] = None,
+    ):
+        """
+        Initialize the async client.
+
+        Args:
+            config: Configuration, defaults to ``get_config()``
+            max_concurrency: Calls running at once, defaults to
+                ``CHROMADB_ASYNC_CONCURRENCY``
+            client: Blocking client to wrap; a new one is created by default.
+                Its collection handles and query cache are shared with the
+                async client.
+        """
+        self.config = config or get_config()
+        self.sync = client or ChromaDBClient(self.config)
+        self.max_concurrency = max(
+            1, max_concurrency or self.config.CHROMADB_ASYNC_CONCURRENCY
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="chromadb-async"
+        )
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking call in the pool once a concurrency slot is free."""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+
+    async def connect(self) -> bool:
+        """Connect to ChromaDB, see :meth:`ChromaDBClient.connect`."""
+        return await self._run(self.sync.connect)
+
+    async def add_documents(
+        self,
+        collection_name: str,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> bool:
+        """Add documents to a collection, see :meth:`ChromaDBClient.add_documents`."""
+        return await self._run(
+            self.sync.add_documents, collection_name, documents, metadatas, ids
+        )
+
+    async def bulk_add_documents(
+        self,
+        collection_name: str,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> Optional[BulkWriteReport]:
+        """Add documents in chunks, see :meth:`ChromaDBClient.bulk_add_documents`."""
+        return await self._run(
+            self.sync.bulk_add_documents,
+            collection_name,
+            documents,
+            metadatas,
+            ids,
+            chunk_size,
+            max_workers,
+        )
+
+    async def query(
+        self,
+        collection_name: str,
+        query_texts: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Query a collection, see :meth:`ChromaDBClient.query`."""
+        return await self._run(
+            self.sync.query, collection_name, query_texts, n_results, where, include
+        )
+
+    async def query_many(
+        self,
+        collection_name: str,
+        query_texts: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> List[Optional[Dict[str, List[Any]]]]:
+        """
+        Query a collection with many texts in concurrent batches.
+
+        Works like :meth:`ChromaDBClient.query_many`, but the batches are
+        awaited together and share the client's concurrency limit with all
+        other calls.
+
+        Returns:
+            One dict of flat hit lists per query text, in input order, or
+            None if its batch failed
+        """
+        batch_size = batch_size or self.config.CHROMADB_QUERY_BATCH_SIZE
+        unique = list(dict.fromkeys(query_texts))
+        if not unique:
+            return []
+
+        # Resolve the collection once before the batches use it
+        collection = await self._run(
+            self.sync.get_or_create_collection, collection_name
+        )
+        if collection is None:
+            return [None] * len(query_texts)
+        max_batch_size = await self._run(self.sync.client.get_max_batch_size)
+        batches = batch_texts(unique, min(batch_size, max_batch_size))
+
+        batch_results = await asyncio.gather(
+            *(
+                self.query(collection_name, batch, n_results, where, include)
+                for batch in batches
+            )
+        )
+
+        logger.debug(
+            f"Async query_many sent {len(query_texts)} texts ({len(unique)} unique) "
+            f"to {collection_name} in {len(batches)} batches"
+        )
+        return split_hits(query_texts, batches, batch_results)
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Check ChromaDB health, see :meth:`ChromaDBClient.health_check`."""
+        status = await self._run(self.sync.health_check)
+        status["max_concurrency"] = self.max_concurrency
+        return status
+
+    def close(self) -> None:
+        """
+        Shut down the thread pool; the shared Chroma client stays open.
+
+        Blocks until running calls finish, so coroutines should await
+        :meth:`aclose` instead.
+        """
+        self._executor.shutdown(wait=True)
+
+    async def aclose(self) -> None:
+        """Shut down the thread pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        # The default executor waits for the pool, keeping the loop responsive
+        await loop.run_in_executor(None, self.close)
+
+    async def __aenter__(self) -> "AsyncChromaDBClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
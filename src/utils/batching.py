@@ -0,0 +1,77 @@
+"""
+Adaptive batch sizing for ChromaDB writes.
+Sizes batches by total characters and steers the budget toward a target
+batch latency using the throughput measured on earlier batches.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional
+
+
+class AdaptiveBatcher:
+    """Character-budgeted batcher that adapts to measured throughput."""
+
+    def __init__(
+        self,
+        initial_docs: int,
+        target_seconds: float = 2.0,
+        max_docs: int = 5000,
+        min_chars: int = 1000,
+        max_chars: int = 5_000_000,
+        smoothing: float = 0.5,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            initial_docs: Documents in the first batch, before any measurement
+            target_seconds: Desired embed + write latency per batch
+            max_docs: Hard cap on documents per batch (server batch limit)
+            min_chars: Lower bound of the character budget
+            max_chars: Upper bound of the character budget
+            smoothing: Weight of the previous budget when adapting (0..1)
+        """
+        self.initial_docs = max(1, min(initial_docs, max_docs))
+        self.target_seconds = target_seconds
+        self.max_docs = max_docs
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.smoothing = smoothing
+        self.char_budget: Optional[float] = None
+        self.total_docs = 0
+        self.total_chars = 0
+        self._offsets: List[int] = []
+
+    def set_documents(self, documents: List[str]) -> None:
+        """Index the documents that following ``next_end`` calls will split."""
+        self._offsets = [0, *accumulate(len(d) for d in documents)]
+
+    def next_end(self, start: int) -> int:
+        """Return the end index of the batch starting at ``start``."""
+        total = len(self._offsets) - 1
+        if self.char_budget is None:
+            end = start + self.initial_docs
+        else:
+            limit = self._offsets[start] + self.char_budget
+            end = bisect_right(self._offsets, limit) - 1
+        return min(max(end, start + 1), start + self.max_docs, total)
+
+    def record(self, docs: int, chars: int, seconds: float) -> None:
+        """Update the character budget from one batch's size and latency."""
+        self.total_docs += docs
+        self.total_chars += chars
+        if seconds <= 0 or chars <= 0:
+            return
+        target = chars / seconds * self.target_seconds
+        if self.char_budget is not None:
+            target = self.smoothing * self.char_budget + (1 - self.smoothing) * target
+        self.char_budget = min(max(target, self.min_chars), self.max_chars)
+
+    @property
+    def settled_docs(self) -> int:
+        """Documents per batch at the current budget and mean document length."""
+        if not self.char_budget or not self.total_chars:
+            return self.initial_docs
+        mean_chars = self.total_chars / self.total_docs
+        return max(1, min(round(self.char_budget / mean_chars), self.max_docs))
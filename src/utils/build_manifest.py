@@ -0,0 +1,53 @@
+"""
+Content hash manifests for ChromaDB vector database builds.
+Writes the id -> content hash map of a collection to disk while it is built,
+so streamed builds do not hold the manifest of the whole dataset in memory.
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+
+class ManifestWriter:
+    """
+    Incrementally written manifest file.
+
+    The file has the layout ``load_manifest`` reads:
+    ``{"collection": ..., "chunker": ..., "documents": {id: hash, ...}}``.
+    Entries go to a temporary file that only replaces the manifest on
+    :meth:`commit`, so a failed build keeps the previous manifest.
+    """
+
+    def __init__(
+        self, manifest_file: Path, collection_name: str, chunker: Optional[str] = None
+    ):
+        """Start writing the manifest of ``collection_name`` to ``manifest_file``."""
+        manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = manifest_file
+        self.tmp_file = manifest_file.with_suffix(".json.tmp")
+        self.count = 0
+        self._file = open(self.tmp_file, "w", encoding="utf-8")
+        header = json.dumps({"collection": collection_name, "chunker": chunker})
+        self._file.write(header[:-1] + ', "documents": {')
+
+    def update(self, entries: Iterable[Tuple[str, str]]) -> None:
+        """Append (document id, content hash) entries; ids must be unique."""
+        for doc_id, content_hash in entries:
+            separator = ", " if self.count else ""
+            self._file.write(
+                f"{separator}{json.dumps(doc_id)}: {json.dumps(content_hash)}"
+            )
+            self.count += 1
+
+    def commit(self) -> None:
+        """Finish the file and atomically replace the previous manifest."""
+        self._file.write("}}")
+        self._file.close()
+        self.tmp_file.replace(self.manifest_file)
+
+    def abort(self) -> None:
+        """Discard the partially written manifest."""
+        if not self._file.closed:
+            self._file.close()
+        self.tmp_file.unlink(missing_ok=True)
@@ -0,0 +1,166 @@
+"""
+Performance statistics for ChromaDB vector database builds.
+Collects per-collection timings and turns them into a JSON-ready report.
+"""
+
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    """
+    Return a peak resident set size in megabytes.
+
+    Args:
+        children: Report the largest child process that has exited and been
+            waited for (e.g. pool workers after shutdown) instead of this
+            process; the two are not summed
+    """
+    if resource is None:
+        return 0.0
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Return the current resident set size of this process in megabytes.
+
+    Read from ``/proc/self/statm``; None where it is not available.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+@dataclass
+class CollectionBuildStats:
+    """
+    Timing and throughput of one collection build.
+
+    ``embed_seconds`` is the time from the start of a batch until its
+    embeddings are available. When embedding runs in an executor it is the
+    time spent waiting on the worker, not the worker's compute time.
+    Memory is sampled at the start and after every batch of the collection:
+    ``rss_peak_mb`` is the largest sample and ``rss_growth_mb`` its increase
+    over the start. The process-wide ``ru_maxrss`` peak is only meaningful
+    for the whole build and is reported there (see :func:`peak_rss_mb`).
+    """
+
+    collection: str
+    documents: int = 0
+    batches: int = 0
+    read_seconds: float = 0.0
+    prepare_seconds: float = 0.0
+    embed_seconds: float = 0.0
+    write_seconds: float = 0.0
+    total_seconds: float = 0.0
+    batch_latencies: List[float] = field(default_factory=list)
+    rss_start_mb: Optional[float] = None
+    rss_peak_mb: Optional[float] = None
+    batch_chars: Optional[float] = None
+    settled_batch_docs: int = 0
+    written_chars: int = 0
+    duplicates: int = 0
+    duplicate_chars: int = 0
+    dedup_seconds: float = 0.0
+    vector_bytes: int = 0
+
+    def add_batch(self, documents: int, embed_seconds: float, write_seconds: float):
+        """Record one written batch."""
+        self.documents += documents
+        self.batches += 1
+        self.embed_seconds += embed_seconds
+        self.write_seconds += write_seconds
+        self.batch_latencies.append(embed_seconds + write_seconds)
+
+    def sample_rss(self) -> None:
+        """Record the current resident set size of the process."""
+        rss = current_rss_mb()
+        if rss is None:
+            return
+        if self.rss_start_mb is None:
+            self.rss_start_mb = rss
+        self.rss_peak_mb = max(rss, self.rss_peak_mb or 0.0)
+
+    def dedup_savings(self) -> Dict[str, Any]:
+        """
+        Estimate what near-duplicate removal saved.
+
+        Build time is extrapolated from the measured embed + write seconds per
+        character; index size counts one vector plus the text per duplicate.
+        """
+        seconds_per_char = (
+            (self.embed_seconds + self.write_seconds) / self.written_chars
+            if self.written_chars
+            else 0.0
+        )
+        index_bytes = self.duplicates * self.vector_bytes + self.duplicate_chars
+        return {
+            "duplicates_folded": self.duplicates,
+            "duplicate_chars": self.duplicate_chars,
+            "dedup_seconds": round(self.dedup_seconds, 3),
+            "estimated_seconds_saved": round(
+                self.duplicate_chars * seconds_per_char, 3
+            ),
+            "estimated_index_mb_saved": round(index_bytes / 1024**2, 2),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable dictionary."""
+        latencies_ms = np.array(self.batch_latencies) * 1000
+        if len(latencies_ms):
+            p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+            latency = {
+                "p50": round(float(p50), 2),
+                "p90": round(float(p90), 2),
+                "p99": round(float(p99), 2),
+                "max": round(float(latencies_ms.max()), 2),
+            }
+        else:
+            latency = {"p50": None, "p90": None, "p99": None, "max": None}
+
+        return {
+            "collection": self.collection,
+            "documents": self.documents,
+            "batches": self.batches,
+            "read_seconds": round(self.read_seconds, 3),
+            "prepare_seconds": round(self.prepare_seconds, 3),
+            "embed_seconds": round(self.embed_seconds, 3),
+            "write_seconds": round(self.write_seconds, 3),
+            "total_seconds": round(self.total_seconds, 3),
+            "docs_per_second": (
+                round(self.documents / self.total_seconds, 1)
+                if self.total_seconds
+                else None
+            ),
+            "batch_latency_ms": latency,
+            "batch_chars": round(self.batch_chars) if self.batch_chars else None,
+            "settled_batch_docs": self.settled_batch_docs,
+            "deduplication": self.dedup_savings(),
+            "rss_start_mb": (
+                round(self.rss_start_mb, 1) if self.rss_start_mb is not None else None
+            ),
+            "rss_peak_mb": (
+                round(self.rss_peak_mb, 1) if self.rss_peak_mb is not None else None
+            ),
+            "rss_growth_mb": (
+                round(self.rss_peak_mb - self.rss_start_mb, 1)
+                if self.rss_start_mb is not None
+                else None
+            ),
+        }
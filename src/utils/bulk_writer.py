@@ -0,0 +1,299 @@
+"""
+Bulk writes to ChromaDB collections.
+Splits large document lists into chunks no larger than the server accepts,
+adds them from a thread pool, retries transient failures with exponential
+backoff and reports the outcome and throughput of every chunk.
+"""
+
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from chromadb.errors import (
+    AuthorizationError,
+    BatchSizeExceededError,
+    ChromaAuthError,
+    DuplicateIDError,
+    InvalidArgumentError,
+    NotFoundError,
+)
+from loguru import logger
+
+# Failures a retry on the same handle cannot fix; anything else (connection
+# resets, timeouts, internal or rate limit errors) is treated as transient
+PERMANENT_ERRORS = (
+    ValueError,
+    TypeError,
+    AuthorizationError,
+    BatchSizeExceededError,
+    ChromaAuthError,
+    DuplicateIDError,
+    InvalidArgumentError,
+    NotFoundError,
+)
+
+
+def document_ids(
+    documents: List[str], metadatas: Optional[List[Dict[str, Any]]] = None
+) -> List[str]:
+    """
+    Derive deterministic ids from document texts and metadata.
+
+    The id is the SHA-256 of the text and its JSON metadata, so documents
+    with the same text and metadata get the same id, in one call as in
+    later ones.
+    """
+    ids = []
+    for i, document in enumerate(documents):
+        payload = document
+        if metadatas and metadatas[i]:
+            payload += "\0" + json.dumps(metadatas[i], sort_keys=True, default=str)
+        ids.append(hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32])
+    return ids
+
+
+@dataclass
+class ChunkOutcome:
+    """Result of writing one chunk."""
+
+    index: int
+    start: int
+    documents: int
+    attempts: int = 0
+    seconds: float = 0.0
+    skipped: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the chunk was written."""
+        return self.error is None
+
+
+@dataclass
+class BulkWriteReport:
+    """Per-chunk outcomes and throughput of one bulk write."""
+
+    collection: str
+    documents: int
+    chunk_size: int
+    seconds: float = 0.0
+    chunks: List[ChunkOutcome] = field(default_factory=list)
+    duplicates: int = 0
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list, repr=False)
+    metadatas: Optional[List[Dict[str, Any]]] = field(default=None, repr=False)
+
+    @property
+    def written(self) -> int:
+        """Documents added by successfully written chunks."""
+        return sum(chunk.documents - chunk.skipped for chunk in self.chunks if chunk.ok)
+
+    @property
+    def skipped(self) -> int:
+        """Documents not added because their id was repeated or already stored."""
+        return self.duplicates + sum(chunk.skipped for chunk in self.chunks)
+
+    @property
+    def failed_chunks(self) -> List[ChunkOutcome]:
+        """Chunks that failed after all retries."""
+        return [chunk for chunk in self.chunks if not chunk.ok]
+
+    @property
+    def ok(self) -> bool:
+        """Whether every chunk was written."""
+        return not self.failed_chunks
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as a JSON-serializable dictionary."""
+        return {
+            "collection": self.collection,
+            "documents": self.documents,
+            "written": self.written,
+            "skipped": self.skipped,
+            "duplicates": self.duplicates,
+            "chunk_size": self.chunk_size,
+            "chunks": len(self.chunks),
+            "failed_chunks": len(self.failed_chunks),
+            "retries": sum(max(0, chunk.attempts - 1) for chunk in self.chunks),
+            "seconds": round(self.seconds, 3),
+            "docs_per_second": (
+                round(self.written / self.seconds, 1) if self.seconds else None
+            ),
+            "failures": [
+                {"start": c.start, "documents": c.documents, "error": c.error}
+                for c in self.failed_chunks
+            ],
+        }
+
+
+def bulk_add(
+    collection: Any,
+    documents: List[str],
+    metadatas: Optional[List[Dict[str, Any]]] = None,
+    ids: Optional[List[str]] = None,
+    chunk_size: int = 1000,
+    max_workers: int = 4,
+    max_retries: int = 3,
+    backoff_seconds: float = 0.5,
+) -> BulkWriteReport:
+    """
+    Add documents to a Chroma collection in concurrent, retried chunks.
+
+    Each id is written once: repeats of an id within ``documents`` are
+    dropped (``report.duplicates``) and documents whose id is already stored
+    are not sent again (``ChunkOutcome.skipped``). Without ``ids`` the ids
+    come from :func:`document_ids`, so re-adding the same documents is a
+    no-op. Chunks that fail with a transient error are retried up to
+    ``max_retries`` times, waiting ``backoff_seconds`` and doubling the wait
+    after each attempt.
+
+    Args:
+        collection: Chroma collection to add to
+        documents: Document texts
+        metadatas: Metadata per document, optional
+        ids: Id per document, defaults to :func:`document_ids`
+        chunk_size: Documents per ``collection.add`` call; callers cap it at
+            the server's maximum batch size
+        max_workers: Chunks written at once
+        max_retries: Retries per chunk after the first attempt
+        backoff_seconds: Wait before the first retry
+
+    Returns:
+        Report with the outcome of every chunk
+    """
+    ids = ids or document_ids(documents, metadatas)
+    first_position: Dict[str, int] = {}
+    for i, doc_id in enumerate(ids):
+        first_position.setdefault(doc_id, i)
+    keep = list(first_position.values())
+    chunk_size = max(1, chunk_size)
+    report = BulkWriteReport(
+        collection.name,
+        len(documents),
+        chunk_size,
+        duplicates=len(documents) - len(keep),
+        ids=list(first_position),
+        texts=[documents[i] for i in keep],
+        metadatas=[metadatas[i] for i in keep] if metadatas else None,
+    )
+    report.chunks = [
+        ChunkOutcome(index, start, len(report.ids[start : start + chunk_size]))
+        for index, start in enumerate(range(0, len(report.ids), chunk_size))
+    ]
+
+    started = time.perf_counter()
+    _write_chunks(
+        collection, report, report.chunks, max_workers, max_retries, backoff_seconds
+    )
+    report.seconds = time.perf_counter() - started
+    _log_report(report)
+    return report
+
+
+def retry_failed_chunks(
+    collection: Any,
+    report: BulkWriteReport,
+    max_workers: int = 4,
+    max_retries: int = 3,
+    backoff_seconds: float = 0.5,
+) -> BulkWriteReport:
+    """
+    Write the failed chunks of a report again, e.g. on a fresh collection handle.
+
+    The chunks keep their ids from the first write and the report is updated
+    in place.
+
+    Args:
+        collection: Chroma collection to add to
+        report: Report returned by :func:`bulk_add`
+        max_workers: Chunks written at once
+        max_retries: Retries per chunk after the first attempt
+        backoff_seconds: Wait before the first retry
+
+    Returns:
+        The updated report
+    """
+    failed = report.failed_chunks
+    if not failed:
+        return report
+    started = time.perf_counter()
+    _write_chunks(collection, report, failed, max_workers, max_retries, backoff_seconds)
+    report.seconds += time.perf_counter() - started
+    _log_report(report)
+    return report
+
+
+def _write_chunks(
+    collection: Any,
+    report: BulkWriteReport,
+    chunks: Sequence[ChunkOutcome],
+    max_workers: int,
+    max_retries: int,
+    backoff_seconds: float,
+) -> None:
+    """Write chunks of a report from a thread pool, recording each outcome."""
+
+    def write(chunk: ChunkOutcome) -> None:
+        positions = range(chunk.start, chunk.start + chunk.documents)
+        started = time.perf_counter()
+        delay = backoff_seconds
+        retries = 0
+        while True:
+            chunk.attempts += 1
+            try:
+                # Ids that are already stored are skipped, not embedded again
+                chunk_ids = [report.ids[i] for i in positions]
+                stored = set(collection.get(ids=chunk_ids, include=[])["ids"])
+                new = [i for i in positions if report.ids[i] not in stored]
+                if new:
+                    collection.add(
+                        documents=[report.texts[i] for i in new],
+                        metadatas=(
+                            [report.metadatas[i] for i in new]
+                            if report.metadatas
+                            else None
+                        ),
+                        ids=[report.ids[i] for i in new],
+                    )
+                chunk.skipped = len(stored)
+                chunk.error = None
+                break
+            except Exception as e:
+                chunk.error = f"{type(e).__name__}: {e}"
+                if isinstance(e, PERMANENT_ERRORS) or retries >= max_retries:
+                    logger.error(
+                        f"Chunk {chunk.index} of {collection.name} failed after "
+                        f"{chunk.attempts} attempts: {chunk.error}"
+                    )
+                    break
+                logger.warning(
+                    f"Chunk {chunk.index} of {collection.name} failed "
+                    f"({chunk.error}), retrying in {delay:.1f}s"
+                )
+                retries += 1
+                time.sleep(delay)
+                delay *= 2
+        chunk.seconds += time.perf_counter() - started
+
+    if len(chunks) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(min(max_workers, len(chunks))) as executor:
+            list(executor.map(write, chunks))
+    else:
+        for chunk in chunks:
+            write(chunk)
+
+
+def _log_report(report: BulkWriteReport) -> None:
+    """Log the totals of a bulk write."""
+    summary = report.to_dict()
+    logger.info(
+        f"Bulk wrote {summary['written']}/{report.documents} documents to "
+        f"{report.collection} in {summary['chunks']} chunks "
+        f"({summary['docs_per_second']} docs/sec, {summary['skipped']} skipped as "
+        f"repeated or already stored, {summary['retries']} retries, "
+        f"{summary['failed_chunks']} failed)"
+    )
@@ -3,12 +3,100 @@ ChromaDB client utilities for the RAG Cybersecurity Classification System.
 Provides an interface to the ChromaDB vector database for RAG operations.
 """
 
+import threading
 import chromadb
 from chromadb.api import ClientAPI
-from typing import List, Dict, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import monotonic
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple, TypeVar, Union
 from loguru import logger
 
 from .config import get_config
+from .collection_aliases import CollectionAliasRegistry, alias_name
+from .chunking import merge_chunks
+from .bulk_writer import BulkWriteReport, bulk_add, retry_failed_chunks
+from .query_cache import QueryResultCache
+
+# Fields a query returns besides ids unless the caller passes ``include``;
+# embeddings are only sent over the wire when asked for
+DEFAULT_INCLUDE = ("metadatas", "documents", "distances")
+
+T = TypeVar("T")
+
+# One Chroma client per connection target and process, opened on first use
+_shared_clients: Dict[Tuple[str, ...], ClientAPI] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(config=None) -> ClientAPI:
+    """
+    Return the process-wide Chroma client for the configured connection.
+
+    ``CHROMADB_MODE`` selects ``"embedded"``, a ``PersistentClient`` that
+    opens the index at ``CHROMADB_PATH`` in this process, or ``"http"``, an
+    ``HttpClient`` for the server at ``CHROMADB_HOST:CHROMADB_PORT``. All
+    callers with the same target share one client.
+
+    Raises:
+        ValueError: If ``CHROMADB_MODE`` is neither ``"embedded"`` nor ``"http"``
+    """
+    config = config or get_config()
+    mode = config.CHROMADB_MODE.lower()
+    if mode == "embedded":
+        key = (mode, str(Path(config.CHROMADB_PATH).resolve()))
+    elif mode == "http":
+        key = (mode, config.CHROMADB_HOST, str(config.CHROMADB_PORT))
+    else:
+        raise ValueError(f"Unknown CHROMADB_MODE: {config.CHROMADB_MODE}")
+
+    with _shared_clients_lock:
+        if key not in _shared_clients:
+            if mode == "embedded":
+                _shared_clients[key] = chromadb.PersistentClient(path=key[1])
+            else:
+                _shared_clients[key] = chromadb.HttpClient(
+                    host=config.CHROMADB_HOST, port=config.CHROMADB_PORT
+                )
+        return _shared_clients[key]
+
+
+def batch_texts(texts: List[str], batch_size: int) -> List[List[str]]:
+    """Split query texts into consecutive batches of at most ``batch_size``."""
+    batch_size = max(1, batch_size)
+    return [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+
+
+def split_hits(
+    query_texts: List[str],
+    batches: List[List[str]],
+    batch_results: List[Optional[Dict[str, Any]]],
+) -> List[Optional[Dict[str, List[Any]]]]:
+    """
+    Map batched query results back to the texts they were queried for.
+
+    Args:
+        query_texts: Texts in the order the caller passed them, may repeat
+        batches: Unique texts as they were batched, see :func:`batch_texts`
+        batch_results: Result dict of :meth:`ChromaDBClient.query` per batch,
+            or None for a failed batch
+
+    Returns:
+        One dict of flat hit lists per query text, with the fields of its
+        batch's result, or None if its batch failed
+    """
+    hits = {}
+    for batch, results in zip(batches, batch_results):
+        for i, text in enumerate(batch):
+            hits[text] = (
+                None
+                if results is None
+                else {
+                    key: values[i] if len(values) else []
+                    for key, values in results.items()
+                }
+            )
+    return [hits[text] for text in query_texts]
 
 
 class ChromaDBClient:
@@ -18,19 +106,37 @@ class ChromaDBClient:
         """Initialize the ChromaDB client with configuration."""
         self.config = config or get_config()
         self.client: Optional[ClientAPI] = None
+        self.aliases: Optional[CollectionAliasRegistry] = None
         self.collections: Dict[str, Any] = {}
-
-        logger.info(
-            f"ChromaDB client initialized for URL: {self.config.chromadb_url()}"
+        self._resolved_at: Dict[str, float] = {}
+        # Guards the handle cache, alias expiry times and hit/miss counters;
+        # reentrant because an expired handle is invalidated during a lookup
+        self._collections_lock = threading.RLock()
+        self.collection_cache_hits = 0
+        self.collection_cache_misses = 0
+        self.query_cache: Optional[QueryResultCache] = (
+            QueryResultCache(
+                self.config.CHROMADB_QUERY_CACHE_SIZE,
+                self.config.CHROMADB_QUERY_CACHE_TTL,
+            )
+            if self.config.CHROMADB_QUERY_CACHE_ENABLED
+            else None
         )
 
+        logger.info(f"ChromaDB client initialized for {self.target()}")
+
+    def target(self) -> str:
+        """Describe the configured connection, e.g. for logs and health checks."""
+        if self.config.CHROMADB_MODE.lower() == "embedded":
+            return f"embedded index at {self.config.CHROMADB_PATH}"
+        return f"URL: {self.config.chromadb_url()}"
+
     def connect(self) -> bool:
-        """Connect to the ChromaDB server."""
+        """Connect to ChromaDB through the process-wide shared client."""
         try:
-            self.client = chromadb.HttpClient(
-                host=self.config.CHROMADB_HOST, port=self.config.CHROMADB_PORT
-            )
-            logger.info("ChromaDB connection established")
+            self.client = get_shared_client(self.config)
+            self.aliases = CollectionAliasRegistry(self.client)
+            logger.info(f"ChromaDB connection established ({self.target()})")
             return True
         except Exception as e:
             logger.error(f"ChromaDB connection failed: {e}")
@@ -52,33 +158,140 @@ class ChromaDBClient:
             logger.error(f"ChromaDB connection test failed: {e}")
             return False
 
+    def resolve_collection_name(self, name: str) -> str:
+        """
+        Resolve a collection alias to the collection currently serving it.
+
+        Rebuilt collections are published under versioned names and switched
+        atomically through the alias registry; unaliased names resolve to
+        themselves.
+        """
+        try:
+            return self.aliases.resolve(name)
+        except Exception as e:
+            logger.warning(f"Alias lookup failed for {name}, using it directly: {e}")
+            return name
+
     def get_or_create_collection(
         self, name: str, metadata: Optional[Dict[str, Any]] = None
     ) -> Optional[Any]:
-        """Get an existing collection or create a new one."""
+        """
+        Get an existing collection (resolving aliases) or create a new one.
+
+        Handles are cached in ``self.collections``. A cached handle is served
+        without a server round trip for ``CHROMADB_ALIAS_TTL`` seconds; after
+        that the alias is resolved again and the handle is replaced if the
+        alias now points to another collection (e.g. after a rebuild was
+        promoted). :meth:`invalidate_collection` drops handles on delete and
+        when an operation on the handle fails. The cache is shared by the
+        worker threads of :meth:`query_many` and the async client, so lookups
+        hold ``self._collections_lock``.
+        """
+        with self._collections_lock:
+            return self._get_or_create_collection(name, metadata)
+
+    def _get_or_create_collection(
+        self, name: str, metadata: Optional[Dict[str, Any]]
+    ) -> Optional[Any]:
+        """Look up or create a collection handle; the caller holds the lock."""
         try:
+            cached = self.collections.get(name)
+            target = None
+            if cached is not None:
+                age = monotonic() - self._resolved_at.get(name, 0.0)
+                if age < self.config.CHROMADB_ALIAS_TTL:
+                    self.collection_cache_hits += 1
+                    return cached
+                target = self.resolve_collection_name(name)
+                if target == cached.name:
+                    self._resolved_at[name] = monotonic()
+                    self.collection_cache_hits += 1
+                    return cached
+                logger.info(f"Alias {name} moved from {cached.name} to {target}")
+                self.invalidate_collection(name)
+            self.collection_cache_misses += 1
+
             if not self.client:
                 if not self.connect():
                     return None
 
             # Try to get existing collection
+            target = target or self.resolve_collection_name(name)
             try:
-                collection = self.client.get_collection(name=name)
-                logger.info(f"Retrieved existing collection: {name}")
+                collection = self.client.get_collection(name=target)
+                logger.info(f"Retrieved existing collection: {target}")
             except:
                 # Create new collection
                 collection = self.client.create_collection(
-                    name=name, metadata=metadata or {}
+                    name=target, metadata=metadata or None
                 )
-                logger.info(f"Created new collection: {name}")
+                logger.info(f"Created new collection: {target}")
 
             self.collections[name] = collection
+            self._resolved_at[name] = monotonic()
             return collection
 
         except Exception as e:
             logger.error(f"Error getting/creating collection {name}: {e}")
             return None
 
+    def invalidate_collection(self, name: str) -> None:
+        """
+        Drop cached handles of a collection, by alias or collection name.
+
+        Cached query results of the collection are dropped as well.
+        """
+        with self._collections_lock:
+            for key in [
+                key
+                for key, collection in self.collections.items()
+                if key == name or collection.name == name
+            ]:
+                self.collections.pop(key, None)
+                self._resolved_at.pop(key, None)
+                if self.query_cache:
+                    self.query_cache.invalidate(key)
+        if self.query_cache:
+            self.query_cache.invalidate(name)
+
+    def _with_collection(self, name: str, operation: Callable[[Any], T]) -> T:
+        """
+        Run an operation on a collection handle, retrying once on a fresh one.
+
+        A cached handle can point to a collection that a rebuild has deleted
+        since; the first failure drops it, so the retry resolves the alias
+        again.
+
+        Raises:
+            LookupError: If the collection is unavailable
+            Exception: The error of the retry
+        """
+        for attempt in range(2):
+            collection = self.get_or_create_collection(name)
+            if collection is None:
+                raise LookupError(f"Collection {name} is unavailable")
+            try:
+                return operation(collection)
+            except Exception as e:
+                self.invalidate_collection(name)
+                if attempt:
+                    raise
+                logger.warning(
+                    f"Operation on {collection.name} failed, retrying with a "
+                    f"fresh handle: {e}"
+                )
+
+    def collection_cache_stats(self) -> Dict[str, Any]:
+        """Return hit and miss counters of the collection handle cache."""
+        with self._collections_lock:
+            lookups = self.collection_cache_hits + self.collection_cache_misses
+            return {
+                "hits": self.collection_cache_hits,
+                "misses": self.collection_cache_misses,
+                "hit_rate": self.collection_cache_hits / lookups if lookups else None,
+                "cached": sorted(self.collections),
+            }
+
     def add_documents(
         self,
         collection_name: str,
@@ -86,33 +299,78 @@ class ChromaDBClient:
         metadatas: Optional[List[Dict[str, Any]]] = None,
         ids: Optional[List[str]] = None,
     ) -> bool:
-        """Add documents to a collection."""
-        try:
-            collection = self.get_or_create_collection(collection_name)
-            if not collection:
-                return False
-
-            # Generate IDs if not provided
-            if not ids:
-                import uuid
+        """
+        Add documents to a collection.
 
-                ids = [str(uuid.uuid4()) for _ in documents]
+        Writes through :meth:`bulk_add_documents`; returns False if any
+        chunk could not be written. Documents whose id is repeated or already
+        stored are skipped, see :func:`bulk_add`.
+        """
+        report = self.bulk_add_documents(collection_name, documents, metadatas, ids)
+        return report is not None and report.ok
 
-            # Prepare metadatas with proper typing
-            if metadatas is None:
-                metadatas = [{} for _ in documents]
-
-            # Add documents
-            collection.add(documents=documents, metadatas=metadatas, ids=ids)
+    def bulk_add_documents(
+        self,
+        collection_name: str,
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> Optional[BulkWriteReport]:
+        """
+        Add many documents in concurrent chunks with retries.
+
+        Chunks hold ``chunk_size`` documents (default
+        ``CHROMADB_WRITE_BATCH_SIZE``, capped by the server's maximum batch
+        size) and are written by up to ``max_workers`` threads (default
+        ``CHROMADB_WRITE_WORKERS``). Transient failures are retried
+        ``CHROMADB_WRITE_RETRIES`` times with exponential backoff starting
+        at ``CHROMADB_WRITE_BACKOFF`` seconds. Without ``ids``, ids are
+        derived from the document texts and metadata, see
+        :func:`document_ids`. Each id is written once; the report counts the
+        documents skipped as repeated or already stored.
+
+        Returns:
+            Report of every chunk's outcome and the throughput, or None if
+            the collection is unavailable
+        """
+        collection = self.get_or_create_collection(collection_name)
+        if not collection:
+            return None
 
-            logger.info(
-                f"Added {len(documents)} documents to collection {collection_name}"
+        chunk_size = chunk_size or self.config.CHROMADB_WRITE_BATCH_SIZE
+        options = {
+            "max_workers": max_workers or self.config.CHROMADB_WRITE_WORKERS,
+            "max_retries": self.config.CHROMADB_WRITE_RETRIES,
+            "backoff_seconds": self.config.CHROMADB_WRITE_BACKOFF,
+        }
+        try:
+            report = bulk_add(
+                collection,
+                documents,
+                metadatas,
+                ids,
+                chunk_size=min(chunk_size, self.client.get_max_batch_size()),
+                **options,
             )
-            return True
-
+            if not report.ok:
+                # The handle may point to a collection that a rebuild has
+                # deleted; retry the failed chunks once on a fresh handle
+                self.invalidate_collection(collection_name)
+                fresh = self.get_or_create_collection(collection_name)
+                if fresh is not None:
+                    retry_failed_chunks(fresh, report, **options)
+                if not report.ok:
+                    self.invalidate_collection(collection_name)
         except Exception as e:
             logger.error(f"Error adding documents to {collection_name}: {e}")
-            return False
+            self.invalidate_collection(collection_name)
+            return None
+        finally:
+            if self.query_cache:
+                self.query_cache.invalidate(collection_name)
+        return report
 
     def query(
         self,
@@ -120,80 +378,273 @@ class ChromaDBClient:
         query_texts: List[str],
         n_results: int = 5,
         where: Optional[Dict[str, Any]] = None,
+        include: Optional[Sequence[str]] = None,
     ) -> Optional[Dict[str, Any]]:
-        """Query a collection for similar documents."""
+        """
+        Query a collection for similar documents.
+
+        The result dict holds ``ids`` and the fields named in ``include``
+        (default ``DEFAULT_INCLUDE``), each with one list per query text.
+        Callers that only read e.g. distances should ask for just those, as
+        every included field is serialized and decoded for each hit.
+
+        With the query result cache enabled (``CHROMADB_QUERY_CACHE_ENABLED``),
+        the results of each text are cached under (collection, normalized
+        text, n_results, where, include) and only uncached texts are sent to
+        Chroma. Cached result lists are shared between callers and must not
+        be modified.
+        """
         try:
-            collection = self.get_or_create_collection(collection_name)
-            if not collection:
-                return None
+            include = tuple(DEFAULT_INCLUDE if include is None else include)
+            fields = ("ids", *include)
+            cache = self.query_cache
+            keys = rows = None
+            pending = query_texts
+            if cache:
+                keys = [
+                    cache.key(collection_name, text, n_results, where, include)
+                    for text in query_texts
+                ]
+                rows = [cache.get(key) for key in keys]
+                pending = list(
+                    dict.fromkeys(
+                        text for text, row in zip(query_texts, rows) if row is None
+                    )
+                )
 
-            results = collection.query(
-                query_texts=query_texts, n_results=n_results, where=where
-            )
+            result_dict = {field: [] for field in fields}
+            if pending:
+                results = self._with_collection(
+                    collection_name,
+                    lambda collection: collection.query(
+                        query_texts=pending,
+                        n_results=n_results,
+                        where=where,
+                        include=list(include),
+                    ),
+                )
 
-            # Convert QueryResult to dict
-            result_dict = {
-                "ids": results.get("ids", []),
-                "distances": results.get("distances", []),
-                "metadatas": results.get("metadatas", []),
-                "documents": results.get("documents", []),
-                "embeddings": results.get("embeddings", []),
-            }
+                # Convert QueryResult to dict
+                result_dict = {
+                    field: (
+                        results.get(field) if results.get(field) is not None else []
+                    )
+                    for field in fields
+                }
+
+            if cache:
+                fresh = {}
+                for i, text in enumerate(pending):
+                    row = {
+                        field: values[i] if len(values) else None
+                        for field, values in result_dict.items()
+                    }
+                    fresh[text] = row
+                    cache.put(
+                        cache.key(collection_name, text, n_results, where, include),
+                        row,
+                    )
+                rows = [row or fresh[text] for text, row in zip(query_texts, rows)]
+                result_dict = {
+                    field: (
+                        [row[field] for row in rows]
+                        if any(row[field] is not None for row in rows)
+                        else []
+                    )
+                    for field in fields
+                }
 
             logger.debug(
-                f"Query returned {len(result_dict.get('documents', []))} results from {collection_name}"
+                f"Query returned {len(result_dict['ids'])} results from {collection_name}"
             )
             return result_dict
 
         except Exception as e:
             logger.error(f"Error querying collection {collection_name}: {e}")
+            self.invalidate_collection(collection_name)
             return None
 
+    def query_many(
+        self,
+        collection_name: str,
+        query_texts: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> List[Optional[Dict[str, List[Any]]]]:
+        """
+        Query a collection with many texts in concurrent batches.
+
+        Identical texts are queried once. The unique texts are split into
+        batches of ``batch_size`` (default ``CHROMADB_QUERY_BATCH_SIZE``,
+        capped by the server's maximum batch size) that run as :meth:`query`
+        calls in up to ``max_workers`` threads (default
+        ``CHROMADB_QUERY_WORKERS``). ``include`` selects the returned
+        fields as in :meth:`query`.
+
+        Returns:
+            One entry per query text, in input order: a dict of flat ``ids``
+            and included field lists of its hits, or None if its batch failed
+        """
+        batch_size = batch_size or self.config.CHROMADB_QUERY_BATCH_SIZE
+        max_workers = max_workers or self.config.CHROMADB_QUERY_WORKERS
+        unique = list(dict.fromkeys(query_texts))
+        if not unique:
+            return []
+
+        # Resolve the collection once before the worker threads use it
+        if self.get_or_create_collection(collection_name) is None:
+            return [None] * len(query_texts)
+        batches = batch_texts(unique, min(batch_size, self.client.get_max_batch_size()))
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            batch_results = list(
+                executor.map(
+                    lambda batch: self.query(
+                        collection_name, batch, n_results, where, include
+                    ),
+                    batches,
+                )
+            )
+
+        logger.debug(
+            f"query_many sent {len(query_texts)} texts ({len(unique)} unique) "
+            f"to {collection_name} in {len(batches)} batches"
+        )
+        return split_hits(query_texts, batches, batch_results)
+
+    def query_chunks(
+        self,
+        collection_name: str,
+        query_texts: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        expand_parents: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Query a chunked collection, returning the best chunk per parent document.
+
+        Over-fetches chunks, keeps only the closest chunk of each ``parent_id``
+        and, with ``expand_parents``, replaces it by the full parent text
+        rebuilt from all of its chunks. Unchunked hits are returned unchanged.
+        """
+        results = self.query(
+            collection_name,
+            query_texts,
+            n_results * 3,
+            where,
+            include=("metadatas", "documents", "distances"),
+        )
+        if results is None:
+            return None
+
+        best = {key: [] for key in ("ids", "distances", "metadatas", "documents")}
+        for ids, distances, metadatas, documents in zip(
+            results["ids"],
+            results["distances"],
+            results["metadatas"],
+            results["documents"],
+        ):
+            seen = set()
+            hits = {key: [] for key in best}
+            for doc_id, distance, metadata, document in zip(
+                ids, distances, metadatas, documents
+            ):
+                parent_id = (metadata or {}).get("parent_id", doc_id)
+                if parent_id in seen or len(seen) == n_results:
+                    continue
+                seen.add(parent_id)
+                hits["ids"].append(doc_id)
+                hits["distances"].append(distance)
+                hits["metadatas"].append(metadata)
+                hits["documents"].append(document)
+            for key in best:
+                best[key].append(hits[key])
+
+        if expand_parents:
+            for metadatas, documents in zip(best["metadatas"], best["documents"]):
+                for i, metadata in enumerate(metadatas):
+                    if (metadata or {}).get("chunk_count", 1) > 1:
+                        siblings = self._with_collection(
+                            collection_name,
+                            lambda collection: collection.get(
+                                where={"parent_id": metadata["parent_id"]},
+                                include=["metadatas", "documents"],
+                            ),
+                        )
+                        documents[i] = merge_chunks(
+                            list(zip(siblings["metadatas"], siblings["documents"]))
+                        )
+
+        return best
+
     def get_collection_info(self, collection_name: str) -> Optional[Dict[str, Any]]:
         """Get information about a collection."""
         try:
-            collection = self.get_or_create_collection(collection_name)
-            if not collection:
-                return None
-
-            info = {
-                "name": collection.name,
-                "count": collection.count(),
-                "metadata": collection.metadata,
-            }
-
-            return info
+            return self._with_collection(
+                collection_name,
+                lambda collection: {
+                    "name": collection.name,
+                    "count": collection.count(),
+                    "metadata": collection.metadata,
+                },
+            )
 
         except Exception as e:
             logger.error(f"Error getting collection info for {collection_name}: {e}")
+            self.invalidate_collection(collection_name)
             return None
 
     def list_collections(self) -> List[str]:
-        """List all collections."""
+        """
+        List the collections readers can query.
+
+        Versioned collections of blue/green builds are listed once under their
+        alias and the alias registry collection is hidden.
+        """
         try:
             if not self.client:
                 if not self.connect():
                     return []
 
-            collections = self.client.list_collections()
-            return [c.name for c in collections]
+            return self.aliases.collection_names()
 
         except Exception as e:
             logger.error(f"Error listing collections: {e}")
             return []
 
     def delete_collection(self, collection_name: str) -> bool:
-        """Delete a collection."""
+        """
+        Delete a collection, by alias or by collection name.
+
+        Deleting an alias removes every versioned collection behind it and the
+        alias entry. Deleting the versioned collection an alias points to also
+        removes the alias, so it never points at a missing collection.
+        """
         try:
             if not self.client:
                 if not self.connect():
                     return False
 
-            self.client.delete_collection(name=collection_name)
-            if collection_name in self.collections:
-                del self.collections[collection_name]
-
-            logger.info(f"Deleted collection: {collection_name}")
+            alias = alias_name(collection_name)
+            target = self.resolve_collection_name(alias)
+            if collection_name == alias:
+                names = self.aliases.versions(alias)
+            else:
+                names = [collection_name]
+            if not names:
+                raise ValueError(f"Collection [{collection_name}] does not exist")
+
+            for name in names:
+                self.client.delete_collection(name=name)
+                self.invalidate_collection(name)
+            if target != alias and target in names:
+                self.aliases.remove_alias(alias)
+            self.invalidate_collection(alias)
+
+            logger.info(f"Deleted collection: {collection_name} ({', '.join(names)})")
             return True
 
         except Exception as e:
@@ -207,6 +658,7 @@ class ChromaDBClient:
             "collections": [],
             "connection": False,
             "url": self.config.chromadb_url(),
+            "mode": self.config.CHROMADB_MODE,
         }
 
         try:
@@ -225,6 +677,9 @@ class ChromaDBClient:
                         collection_info[collection_name] = info["count"]
 
                 health["collection_counts"] = collection_info
+                health["collection_cache"] = self.collection_cache_stats()
+                if self.query_cache:
+                    health["query_cache"] = self.query_cache.stats()
             else:
                 health["status"] = "unhealthy"
 
@@ -240,7 +695,7 @@ def test_chromadb_connection():
     client = ChromaDBClient()
 
     print("=== ChromaDB Connection Test ===")
-    print(f"ChromaDB URL: {client.config.chromadb_url()}")
+    print(f"ChromaDB: {client.target()}")
 
     # Test connection
     if client.test_connection():
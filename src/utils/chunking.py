@@ -0,0 +1,131 @@
+"""
+Token-aware document chunking for the ChromaDB vector database.
+Splits long documents into overlapping token windows that fit the embedding
+model, and merges chunks back into their parent document at query time.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Words and single punctuation marks, used when the model tokenizer is not
+# available. WordPiece splits rare words, paths and hashes into several
+# tokens, so this undercounts what all-MiniLM-L6-v2 sees.
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def token_spans(text: str, tokenizer: Optional[Any] = None) -> List[Tuple[int, int]]:
+    """
+    Return the (start, end) character span of every token in a text.
+
+    Args:
+        text: Text to tokenize
+        tokenizer: ``tokenizers.Tokenizer`` of the embedding model (see
+            ``embeddings.get_tokenizer``); ``TOKEN_PATTERN`` is used without one
+    """
+    if tokenizer is not None:
+        return list(tokenizer.encode(text, add_special_tokens=False).offsets)
+    return [match.span() for match in TOKEN_PATTERN.finditer(text)]
+
+
+def chunker_id(tokenizer: Optional[Any], max_tokens: int, overlap: int) -> str:
+    """
+    Identify how documents are split into chunks.
+
+    Chunk ids and positions depend on the token counter and window sizes, so
+    builds store this id and start over when it changes.
+    """
+    kind = "wordpiece" if tokenizer is not None else "regex"
+    return f"{kind}:{max_tokens}:{overlap}"
+
+
+def split_text(
+    text: str,
+    max_tokens: int = 200,
+    overlap: int = 32,
+    tokenizer: Optional[Any] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Split a text into overlapping windows of at most ``max_tokens`` tokens.
+
+    Args:
+        text: Text to split
+        max_tokens: Maximum tokens per chunk, excluding the model's special
+            tokens
+        overlap: Tokens shared between consecutive chunks
+        tokenizer: Model tokenizer to count with, see :func:`token_spans`
+
+    Returns:
+        (char_start, char_end) span of each chunk in the original text
+    """
+    spans = token_spans(text, tokenizer)
+    if len(spans) <= max_tokens:
+        return [(0, len(text))]
+
+    step = max(1, max_tokens - overlap)
+    chunks = []
+    for first in range(0, len(spans), step):
+        last = min(first + max_tokens, len(spans)) - 1
+        chunks.append((spans[first][0], spans[last][1]))
+        if last == len(spans) - 1:
+            break
+    return chunks
+
+
+def chunk_documents(
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    ids: List[str],
+    max_tokens: int = 200,
+    overlap: int = 32,
+    tokenizer: Optional[Any] = None,
+) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+    """
+    Split prepared documents into chunks that carry their parent id.
+
+    Documents that fit in one chunk keep their id; longer ones become
+    ``<id>#c<n>``. Every chunk's metadata gets ``parent_id``, ``chunk_index``,
+    ``chunk_count`` and its ``char_start``/``char_end`` in the parent text.
+    Pass the model ``tokenizer`` so ``max_tokens`` counts the tokens the
+    embedding model sees rather than ``TOKEN_PATTERN`` words.
+
+    Returns:
+        Tuple of (documents, metadatas, ids) for the chunks
+    """
+    chunk_docs, chunk_metadatas, chunk_ids = [], [], []
+    for document, metadata, doc_id in zip(documents, metadatas, ids):
+        spans = split_text(document, max_tokens, overlap, tokenizer)
+        for index, (start, end) in enumerate(spans):
+            chunk_docs.append(document[start:end])
+            chunk_metadatas.append(
+                {
+                    **metadata,
+                    "parent_id": doc_id,
+                    "chunk_index": index,
+                    "chunk_count": len(spans),
+                    "char_start": start,
+                    "char_end": end,
+                }
+            )
+            chunk_ids.append(doc_id if len(spans) == 1 else f"{doc_id}#c{index}")
+    return chunk_docs, chunk_metadatas, chunk_ids
+
+
+def merge_chunks(chunks: List[Tuple[Dict[str, Any], str]]) -> str:
+    """
+    Rebuild a parent document from its chunks.
+
+    Args:
+        chunks: (metadata, document) pairs of one parent, in any order
+
+    Returns:
+        The parent text, with overlapping regions included once
+    """
+    parent = ""
+    end = 0
+    for metadata, document in sorted(chunks, key=lambda c: c[0]["char_start"]):
+        start = metadata["char_start"]
+        if start > end and parent:
+            parent += " "  # Whitespace between non-overlapping chunks
+        parent += document[max(0, end - start) :]
+        end = max(end, metadata["char_end"])
+    return parent
@@ -0,0 +1,93 @@
+"""
+Collection alias registry for zero-downtime ChromaDB rebuilds.
+Maps stable collection names (e.g. ``mitre_techniques``) to the versioned
+collection that currently serves them. The registry is itself a small Chroma
+collection, so every client of the same database sees the same aliases and a
+switch is a single atomic upsert.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+ALIAS_COLLECTION = "collection_aliases"
+VERSION_SEPARATOR = "__v"
+
+
+def versioned_name(alias: str, version: str) -> str:
+    """Return the name of a versioned collection for an alias."""
+    return f"{alias}{VERSION_SEPARATOR}{version}"
+
+
+def alias_name(name: str) -> str:
+    """Return the alias a versioned collection belongs to, or ``name`` itself."""
+    return name.split(VERSION_SEPARATOR, 1)[0]
+
+
+class CollectionAliasRegistry:
+    """Registry of collection aliases stored in a ChromaDB client."""
+
+    def __init__(self, client: Any):
+        """Initialize the registry on a connected Chroma client."""
+        self.client = client
+        self._collection = None
+
+    @property
+    def collection(self) -> Any:
+        """Alias collection, created on first use without an embedding model."""
+        if self._collection is None:
+            self._collection = self.client.get_or_create_collection(
+                ALIAS_COLLECTION, embedding_function=None
+            )
+        return self._collection
+
+    def resolve(self, name: str) -> str:
+        """Return the collection an alias points to, or ``name`` if unaliased."""
+        result = self.collection.get(ids=[name], include=["metadatas"])
+        if result["ids"]:
+            return result["metadatas"][0]["target"]
+        return name
+
+    def aliases(self) -> Dict[str, str]:
+        """Return all aliases and their targets."""
+        result = self.collection.get(include=["metadatas"])
+        return {
+            alias: metadata["target"]
+            for alias, metadata in zip(result["ids"], result["metadatas"])
+        }
+
+    def set_alias(self, alias: str, target: str) -> None:
+        """Atomically point an alias at a collection."""
+        self.collection.upsert(
+            ids=[alias],
+            embeddings=[[1.0]],  # Placeholder, aliases are looked up by id only
+            metadatas=[{"target": target, "updated_at": datetime.now().isoformat()}],
+        )
+
+    def remove_alias(self, alias: str) -> None:
+        """Remove an alias; its name then resolves to itself again."""
+        self.collection.delete(ids=[alias])
+
+    def collection_names(self) -> List[str]:
+        """
+        Return the names readers query by: aliases and unversioned collections.
+
+        Versioned collections are listed under their alias, and the registry
+        collection itself is hidden.
+        """
+        names = [c.name for c in self.client.list_collections()]
+        aliases = self.aliases() if ALIAS_COLLECTION in names else {}
+        plain = {
+            name
+            for name in names
+            if name != ALIAS_COLLECTION and VERSION_SEPARATOR not in name
+        }
+        return sorted(plain | set(aliases))
+
+    def versions(self, alias: str) -> List[str]:
+        """Return all collections that belong to an alias, oldest first."""
+        names = [c.name for c in self.client.list_collections()]
+        return sorted(
+            name
+            for name in names
+            if name == alias or name.startswith(alias + VERSION_SEPARATOR)
+        )
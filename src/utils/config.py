@@ -18,11 +18,39 @@ class Config(BaseSettings):
     DATA_DIR: str = Field(default="data")
     RAW_DIR: str = Field(default="data/raw")
     PROCESSED_DIR: str = Field(default="data/processed")
+    DATASET_DOWNLOAD_WORKERS: int = Field(default=4)
+    DATASET_MIRROR_DIR: Optional[str] = None
+    DATASET_LOAD_WORKERS: int = Field(default=4)
+    DATASET_COMPACT_LOADING: bool = Field(default=False)
+    DATASET_CATEGORY_MAX_RATIO: float = Field(default=0.05)
+    DATASET_PROCESSED_SNAPSHOTS: bool = Field(default=True)
 
     # ChromaDB
     CHROMADB_HOST: str = Field(default="localhost")
     CHROMADB_PORT: int = Field(default=8000)
     CHROMADB_URL: Optional[str] = None
+    CHROMADB_MODE: str = Field(default="http")  # "http" or "embedded"
+    CHROMADB_PATH: str = Field(default="data/chromadb")
+    CHROMADB_ALIAS_TTL: float = Field(default=30.0)
+    CHROMADB_QUERY_BATCH_SIZE: int = Field(default=64)
+    CHROMADB_QUERY_WORKERS: int = Field(default=4)
+    CHROMADB_ASYNC_CONCURRENCY: int = Field(default=8)
+    CHROMADB_WRITE_BATCH_SIZE: int = Field(default=1000)
+    CHROMADB_WRITE_WORKERS: int = Field(default=4)
+    CHROMADB_WRITE_RETRIES: int = Field(default=3)
+    CHROMADB_WRITE_BACKOFF: float = Field(default=0.5)
+    CHROMADB_QUERY_CACHE_ENABLED: bool = Field(default=False)
+    CHROMADB_QUERY_CACHE_SIZE: int = Field(default=4096)
+    CHROMADB_QUERY_CACHE_TTL: float = Field(default=300.0)
+    CHROMADB_BUILD_WORKERS: int = Field(default=1)
+    CHROMADB_STREAM_BATCH_MB: float = Field(default=64)
+    CHROMADB_BATCH_TARGET_SECONDS: float = Field(default=2.0)
+    CHROMADB_CHUNK_TOKENS: int = Field(default=200)
+    CHROMADB_CHUNK_OVERLAP: int = Field(default=32)
+    CHROMADB_DEDUP_ENABLED: bool = Field(default=False)
+    CHROMADB_DEDUP_THRESHOLD: float = Field(default=0.9)
+    EMBEDDING_CACHE_ENABLED: bool = Field(default=True)
+    EMBEDDING_CACHE_DIR: str = Field(default="data/embedding_cache")
 
     # LLM
     OLLAMA_HOST: str = Field(default="localhost")
@@ -0,0 +1,549 @@
+"""
+Dataset loading for the Cybersecurity RAG System.
+Reads the downloaded Parquet datasets (whole, projected, filtered, streamed or
+as processed snapshots) and summarizes them from their file metadata.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .config import get_config, get_processed_path, get_raw_path
+from .logger import setup_logger
+from .processed_store import fingerprint_files, read_snapshot, write_snapshot
+
+logger = setup_logger()
+
+# Arrow string columns become pandas "string[pyarrow]" in compact mode
+COMPACT_STRING_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
+
+# Datasets downloaded by 01_get_datasets.py
+DATASET_NAMES = ["heimdall", "ttp_mapping", "security_attacks", "cyber_rules"]
+
+# Texts of at most this many characters are dropped, as in the builder
+MIN_TEXT_CHARS = 10
+
+# CPython str header size; object columns also hold an 8 byte pointer per row
+PY_STR_OVERHEAD = 49
+# Size pandas counts for each None in an object column
+PY_NONE_SIZE = 16
+
+
+def estimate_object_memory(table: pa.Table) -> int:
+    """
+    Estimate the pandas memory of a table loaded with object-dtype strings.
+
+    Equals ``memory_usage(deep=True)`` of a default ``to_pandas()`` for ASCII
+    text, without materializing the Python strings.
+
+    Args:
+        table: Arrow table to estimate
+
+    Returns:
+        Estimated size in bytes
+    """
+    total = 0
+    for column in table.columns:
+        if column.type in COMPACT_STRING_TYPES:
+            valid = len(column) - column.null_count
+            text_bytes = pc.sum(pc.binary_length(column)).as_py() or 0
+            total += (
+                8 * len(column)
+                + PY_STR_OVERHEAD * valid
+                + PY_NONE_SIZE * column.null_count
+                + text_bytes
+            )
+        else:
+            total += column.nbytes
+    return total
+
+
+def to_compact_pandas(
+    table: pa.Table, category_max_ratio: Optional[float] = 0.05
+) -> pd.DataFrame:
+    """
+    Convert an Arrow table to a memory-compact DataFrame.
+
+    Strings stay in Arrow buffers as ``string[pyarrow]``. String columns with
+    few distinct values relative to their length (tactics, labels, splits)
+    become categoricals.
+
+    Args:
+        table: Arrow table to convert
+        category_max_ratio: Maximum distinct/rows ratio of a categorical
+            column; None keeps all strings as ``string[pyarrow]``
+
+    Returns:
+        DataFrame with compact string and categorical columns
+    """
+    df = table.to_pandas(types_mapper=COMPACT_STRING_TYPES.get)
+    if len(df) == 0 or category_max_ratio is None:
+        return df
+    for name in df.columns:
+        if isinstance(df[name].dtype, pd.StringDtype):
+            if df[name].nunique() / len(df) <= category_max_ratio:
+                df[name] = df[name].astype("category")
+    return df
+
+
+def get_dataset_files(dataset_name: str) -> List[Path]:
+    """
+    Locate all Parquet files of a dataset in the raw data directory.
+
+    Multi-split datasets are saved as ``{name}_{split}.parquet``; the files
+    are returned sorted by name so row positions are stable between runs.
+
+    Args:
+        dataset_name: Name of the dataset folder (heimdall, ttp_mapping, etc.)
+
+    Returns:
+        Sorted list of Parquet files, empty if none were found
+    """
+    raw_path = get_raw_path()
+    dataset_dir = Path(raw_path) / dataset_name
+
+    if not dataset_dir.exists():
+        logger.error(f"Dataset directory not found: {dataset_dir}")
+        return []
+
+    # Find parquet files in the dataset directory
+    parquet_files = sorted(dataset_dir.glob("*.parquet"))
+
+    if not parquet_files:
+        logger.error(f"No parquet files found in {dataset_dir}")
+
+    return parquet_files
+
+
+def load_dataset(
+    dataset_name: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[Union[ds.Expression, List[Any]]] = None,
+    compact: Optional[bool] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Load a single dataset from the raw data directory.
+
+    All split files of the dataset are read as one Arrow dataset. Only the
+    requested columns are read, and filters are pushed down into the Parquet
+    scan so row groups without matches are skipped. The index is the row
+    position in the unfiltered dataset, so filtered loads keep the same row
+    ids as full loads.
+
+    Args:
+        dataset_name: Name of the dataset folder (heimdall, ttp_mapping, etc.)
+        columns: Optional subset of columns to load
+        filters: Optional row filter, either a ``pyarrow.dataset`` expression
+            or ``pd.read_parquet``-style tuples, e.g. ``[("split", "==", "train")]``
+        compact: Load strings as ``string[pyarrow]`` and low-cardinality
+            columns as categoricals; defaults to ``DATASET_COMPACT_LOADING``
+
+    Returns:
+        DataFrame containing the dataset or None if not found
+    """
+    config = get_config()
+    if compact is None:
+        compact = config.DATASET_COMPACT_LOADING
+
+    try:
+        parquet_files = get_dataset_files(dataset_name)
+        if not parquet_files:
+            return None
+
+        logger.info(
+            f"Loading dataset: {dataset_name} from "
+            f"{', '.join(f.name for f in parquet_files)}"
+        )
+
+        dataset = ds.dataset(parquet_files, format="parquet")
+        if filters is None:
+            table = dataset.to_table(columns=columns)
+            positions = None
+        else:
+            expression = (
+                filters
+                if isinstance(filters, ds.Expression)
+                else pq.filters_to_expression(filters)
+            )
+            # Row positions come from a scan of only the filter columns; the
+            # filter is then pushed down into the read of the projection, so
+            # row groups without matches are skipped by their statistics
+            matches = dataset.to_table(columns={"match": expression}).column("match")
+            positions = np.flatnonzero(
+                matches.fill_null(False).to_numpy(zero_copy_only=False)
+            )
+            table = dataset.to_table(columns=columns, filter=expression)
+
+        if compact:
+            df = to_compact_pandas(table, config.DATASET_CATEGORY_MAX_RATIO)
+            before_mb = estimate_object_memory(table) / 1024**2
+            after_mb = df.memory_usage(deep=True).sum() / 1024**2
+            categoricals = [
+                name
+                for name in df.columns
+                if isinstance(df[name].dtype, pd.CategoricalDtype)
+            ]
+            logger.info(
+                f"Compact loading saved {before_mb - after_mb:.1f} MB on "
+                f"{dataset_name} ({before_mb:.1f} MB -> {after_mb:.1f} MB), "
+                f"categoricals: {', '.join(categoricals) or 'none'}"
+            )
+        else:
+            df = table.to_pandas()
+        if positions is not None:
+            df.index = pd.Index(positions)
+
+        logger.info(f"Loaded {len(df)} records with {len(df.columns)} columns")
+
+        return df
+
+    except Exception as e:
+        logger.error(f"Error loading dataset {dataset_name}: {e}")
+        return None
+
+
+def iter_dataset_batches(
+    dataset_name: str, batch_mb: float = 64, columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a dataset from its Parquet files in memory-bounded chunks.
+
+    The chunk size in rows is derived from the uncompressed row group sizes
+    in each file footer so that each chunk stays near ``batch_mb``. Chunks
+    keep the row positions of the whole dataset as their index, matching the
+    index ``load_dataset`` produces.
+
+    Args:
+        dataset_name: Name of the dataset folder (heimdall, ttp_mapping, etc.)
+        batch_mb: Approximate uncompressed size of one chunk in megabytes
+        columns: Optional subset of columns to read
+
+    Yields:
+        DataFrame chunks in file order
+    """
+    offset = 0
+    for parquet_file in get_dataset_files(dataset_name):
+        parquet = pq.ParquetFile(parquet_file)
+        metadata = parquet.metadata
+        total_bytes = sum(
+            metadata.row_group(i).total_byte_size
+            for i in range(metadata.num_row_groups)
+        )
+        bytes_per_row = max(1, total_bytes // max(1, metadata.num_rows))
+        batch_rows = max(1, int(batch_mb * 1024**2 // bytes_per_row))
+        logger.info(
+            f"Streaming dataset: {dataset_name} from {parquet_file.name} "
+            f"in chunks of {batch_rows:,} rows (~{batch_mb} MB)"
+        )
+
+        for batch in parquet.iter_batches(batch_size=batch_rows, columns=columns):
+            df = batch.to_pandas()
+            df.index = pd.RangeIndex(offset, offset + len(df))
+            offset += len(df)
+            yield df
+
+
+def process_dataset(
+    dataset_name: str, text_field: str, columns: Optional[List[str]] = None
+) -> Optional[pa.Table]:
+    """
+    Clean a raw dataset into a document table.
+
+    The text field is cast to string and stripped, rows whose text is null
+    or at most ``MIN_TEXT_CHARS`` characters are dropped, and exact duplicate
+    rows are removed keeping the first. A ``row_id`` column keeps each row's
+    position in the raw dataset.
+
+    Args:
+        dataset_name: Name of the dataset folder (heimdall, ttp_mapping, etc.)
+        text_field: Column holding the document text
+        columns: Optional subset of columns to keep
+
+    Returns:
+        Cleaned Arrow table, or None if the dataset or text field is missing
+    """
+    parquet_files = get_dataset_files(dataset_name)
+    if not parquet_files:
+        return None
+
+    table = ds.dataset(parquet_files, format="parquet").to_table(columns=columns)
+    if text_field not in table.column_names:
+        logger.error(f"Text field {text_field} not found in {dataset_name}")
+        return None
+    raw_rows = table.num_rows
+
+    table = table.append_column(
+        "row_id", pa.array(range(table.num_rows), type=pa.int64())
+    )
+    texts = pc.utf8_trim_whitespace(table.column(text_field).cast(pa.string()))
+    table = table.set_column(
+        table.column_names.index(text_field), text_field, texts
+    ).filter(pc.greater(pc.utf8_length(texts), MIN_TEXT_CHARS))
+    filtered_rows = table.num_rows
+
+    keys = [name for name in table.column_names if name != "row_id"]
+    if any(pa.types.is_nested(table.schema.field(name).type) for name in keys):
+        logger.warning(f"Skipping deduplication of {dataset_name}: nested columns")
+    else:
+        first_rows = table.group_by(keys, use_threads=False).aggregate(
+            [("row_id", "min")]
+        )
+        table = table.filter(
+            pc.is_in(table.column("row_id"), value_set=first_rows.column("row_id_min"))
+        )
+
+    logger.info(
+        f"Processed {dataset_name}: {raw_rows:,} raw rows, "
+        f"{raw_rows - filtered_rows:,} without text, "
+        f"{filtered_rows - table.num_rows:,} duplicates, {table.num_rows:,} kept"
+    )
+    return table
+
+
+def load_processed_dataset(
+    dataset_name: str,
+    text_field: str,
+    columns: Optional[List[str]] = None,
+    compact: Optional[bool] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Load the processed document table of a dataset from its snapshot.
+
+    Snapshots live in ``PROCESSED_DIR`` as ``{name}.arrow`` and are tagged
+    with a fingerprint of the raw file contents and processing parameters.
+    Raw files are only hashed again when their size or mtime changed, see
+    :func:`fingerprint_files`.
+    A fresh snapshot is memory-mapped; strings stay in the mapped Arrow
+    buffers as ``string[pyarrow]``. A missing or stale one is rebuilt with
+    :func:`process_dataset` first. The index holds the raw row positions, as
+    in :func:`load_dataset`.
+
+    Args:
+        dataset_name: Name of the dataset folder (heimdall, ttp_mapping, etc.)
+        text_field: Column holding the document text
+        columns: Optional subset of columns to keep
+        compact: Also convert low-cardinality columns to categoricals;
+            defaults to ``DATASET_COMPACT_LOADING``
+
+    Returns:
+        DataFrame of the processed dataset or None if it cannot be built
+    """
+    config = get_config()
+    if compact is None:
+        compact = config.DATASET_COMPACT_LOADING
+
+    try:
+        parquet_files = get_dataset_files(dataset_name)
+        if not parquet_files:
+            return None
+
+        snapshot_file = get_processed_path() / f"{dataset_name}.arrow"
+        fingerprint = fingerprint_files(
+            parquet_files,
+            {
+                "dataset": dataset_name,
+                "text_field": text_field,
+                "columns": columns,
+                "min_text_chars": MIN_TEXT_CHARS,
+            },
+            digest_file=snapshot_file.with_suffix(".digests.json"),
+        )
+        table = read_snapshot(snapshot_file, fingerprint)
+        if table is None:
+            logger.info(f"Building processed snapshot: {snapshot_file}")
+            table = process_dataset(dataset_name, text_field, columns)
+            if table is None:
+                return None
+            write_snapshot(snapshot_file, table, fingerprint)
+            table = read_snapshot(snapshot_file)
+        else:
+            logger.info(f"Memory-mapped processed snapshot: {snapshot_file}")
+
+        df = to_compact_pandas(
+            table.select([name for name in table.column_names if name != "row_id"]),
+            config.DATASET_CATEGORY_MAX_RATIO if compact else None,
+        )
+        df.index = pd.Index(table.column("row_id").to_numpy())
+        logger.info(f"Loaded {len(df)} processed records of {dataset_name}")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error loading processed dataset {dataset_name}: {e}")
+        return None
+
+
+def get_dataset_summary(datasets: Dict[str, pd.DataFrame]) -> None:
+    """
+    Log summary information for all loaded datasets.
+
+    Args:
+        datasets: Dictionary of dataset name to DataFrame mappings
+    """
+    if not datasets:
+        logger.warning("No datasets available for summary")
+        return
+
+    logger.info("Dataset summary report:")
+
+    total_records = 0
+    total_memory = 0
+
+    for name, df in datasets.items():
+        memory_mb = df.memory_usage(deep=True).sum() / 1024**2
+        cols_preview = ", ".join(list(df.columns)[:3])
+        if len(df.columns) > 3:
+            cols_preview += f" (+{len(df.columns)-3} more)"
+
+        logger.info(
+            f"  {name}: {len(df):,} records, {len(df.columns)} columns, {memory_mb:.1f} MB"
+        )
+        logger.info(f"    Columns: {cols_preview}")
+
+        total_records += len(df)
+        total_memory += memory_mb
+
+    logger.info(
+        f"Summary totals: {total_records:,} records, {total_memory:.1f} MB across {len(datasets)} datasets"
+    )
+
+
+def get_file_summary(
+    dataset_name: str, deep_sample_rows: int = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    Summarize a dataset from its Parquet footers without reading any data.
+
+    Args:
+        dataset_name: Name of the dataset folder (heimdall, ttp_mapping, etc.)
+        deep_sample_rows: If positive, read about this many rows, taken from
+            the start of up to 10 evenly spaced row groups, into pandas and
+            extrapolate ``memory_usage(deep=True)`` to the whole dataset
+
+    Returns:
+        Dictionary with row count, schema, per-file row group sizes and
+        compressed/uncompressed bytes, or None if no files were found
+    """
+    parquet_files = get_dataset_files(dataset_name)
+    if not parquet_files:
+        return None
+
+    summary = {
+        "dataset": dataset_name,
+        "rows": 0,
+        "compressed_bytes": 0,
+        "uncompressed_bytes": 0,
+        "schema": {},
+        "files": [],
+    }
+    for parquet_file in parquet_files:
+        metadata = pq.read_metadata(parquet_file)
+        compressed = uncompressed = 0
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            for j in range(row_group.num_columns):
+                compressed += row_group.column(j).total_compressed_size
+                uncompressed += row_group.column(j).total_uncompressed_size
+
+        summary["rows"] += metadata.num_rows
+        summary["compressed_bytes"] += compressed
+        summary["uncompressed_bytes"] += uncompressed
+        for field in metadata.schema.to_arrow_schema():
+            summary["schema"].setdefault(field.name, str(field.type))
+        summary["files"].append(
+            {
+                "file": parquet_file.name,
+                "rows": metadata.num_rows,
+                "row_groups": [
+                    metadata.row_group(i).num_rows
+                    for i in range(metadata.num_row_groups)
+                ],
+                "compressed_bytes": compressed,
+                "uncompressed_bytes": uncompressed,
+            }
+        )
+
+    if deep_sample_rows > 0 and summary["rows"]:
+        # Leading rows of up to 10 row groups spread over all files
+        row_groups = [
+            (parquet_file, i)
+            for parquet_file, file_summary in zip(parquet_files, summary["files"])
+            for i in range(len(file_summary["row_groups"]))
+        ]
+        step = max(1, len(row_groups) // 10)
+        picked = row_groups[::step][:10]
+        per_group = max(1, deep_sample_rows // len(picked))
+        sample_rows = sample_bytes = 0
+        for parquet_file, i in picked:
+            batches = pq.ParquetFile(parquet_file).iter_batches(
+                batch_size=per_group, row_groups=[i]
+            )
+            batch = next(batches, None)
+            if batch is not None:
+                sample_rows += batch.num_rows
+                sample_bytes += batch.to_pandas().memory_usage(deep=True).sum()
+        if sample_rows:
+            summary["estimated_memory_bytes"] = int(
+                sample_bytes / sample_rows * summary["rows"]
+            )
+            summary["memory_sample_rows"] = sample_rows
+
+    return summary
+
+
+def log_file_summary(
+    dataset_names: Optional[List[str]] = None, deep_sample_rows: int = 0
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Log a metadata-only inventory of the raw datasets.
+
+    Args:
+        dataset_names: Datasets to summarize, defaults to all
+        deep_sample_rows: Sample size for the deep memory estimate, 0 to skip
+
+    Returns:
+        Dictionary mapping dataset names to their :func:`get_file_summary`
+    """
+    summaries = {}
+    for name in dataset_names or DATASET_NAMES:
+        summary = get_file_summary(name, deep_sample_rows)
+        if summary is not None:
+            summaries[name] = summary
+
+    if not summaries:
+        logger.warning("No datasets available for summary")
+        return summaries
+
+    logger.info("Dataset file summary report:")
+    for name, summary in summaries.items():
+        row_groups = sum(len(f["row_groups"]) for f in summary["files"])
+        line = (
+            f"  {name}: {summary['rows']:,} records, {len(summary['schema'])} columns, "
+            f"{len(summary['files'])} files, {row_groups} row groups, "
+            f"{summary['compressed_bytes'] / 1024**2:.1f} MB compressed, "
+            f"{summary['uncompressed_bytes'] / 1024**2:.1f} MB uncompressed"
+        )
+        if "estimated_memory_bytes" in summary:
+            line += (
+                f", ~{summary['estimated_memory_bytes'] / 1024**2:.1f} MB in pandas "
+                f"(from {summary['memory_sample_rows']:,} rows)"
+            )
+        logger.info(line)
+        logger.info(
+            "    Schema: "
+            + ", ".join(f"{col}: {dtype}" for col, dtype in summary["schema"].items())
+        )
+
+    logger.info(
+        f"Summary totals: {sum(s['rows'] for s in summaries.values()):,} records, "
+        f"{sum(s['compressed_bytes'] for s in summaries.values()) / 1024**2:.1f} MB "
+        f"on disk across {len(summaries)} datasets"
+    )
+    return summaries
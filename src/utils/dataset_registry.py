@@ -0,0 +1,237 @@
+"""
+Lazy dataset registry for the Cybersecurity RAG System.
+Hands out handles that load a dataset on first access and keep it for the
+life of the process, so callers only pay for the datasets they use.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional
+
+import pandas as pd
+
+from .config import get_config
+from .dataset_loader import (
+    DATASET_NAMES,
+    get_dataset_files,
+    load_dataset,
+    load_processed_dataset,
+)
+from .logger import setup_logger
+
+logger = setup_logger()
+
+
+class DatasetHandle:
+    """Dataset that is loaded on first access and cached afterwards."""
+
+    def __init__(self, name: str, loader: Callable[[], Optional[pd.DataFrame]]):
+        """
+        Initialize the handle.
+
+        Args:
+            name: Dataset name
+            loader: Function that loads the dataset, returning None on failure
+        """
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._df: Optional[pd.DataFrame] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the dataset is in memory."""
+        return self._df is not None
+
+    def get(self) -> Optional[pd.DataFrame]:
+        """
+        Return the dataset, loading it on the first call.
+
+        Concurrent callers wait for a single load. Failed loads are not
+        cached, so a later call retries.
+        """
+        if self._df is None:
+            with self._lock:
+                if self._df is None:
+                    self._df = self._loader()
+        return self._df
+
+    def release(self) -> None:
+        """Drop the cached DataFrame; the next ``get`` loads it again."""
+        with self._lock:
+            self._df = None
+
+
+class DatasetRegistry:
+    """Process-wide cache of lazy dataset handles."""
+
+    def __init__(self, names: Optional[List[str]] = None, max_workers: int = 4):
+        """
+        Initialize the registry.
+
+        Args:
+            names: Known datasets, defaults to ``DATASET_NAMES``
+            max_workers: Threads used to load several datasets at once
+        """
+        self.names = list(names or DATASET_NAMES)
+        self.max_workers = max_workers
+        self._handles: Dict[Hashable, DatasetHandle] = {}
+        self._lock = threading.Lock()
+
+    def available(self) -> List[str]:
+        """Return the known datasets that have files in the raw directory."""
+        return [name for name in self.names if get_dataset_files(name)]
+
+    def _handle(
+        self, key: Hashable, name: str, loader: Callable[[], Optional[pd.DataFrame]]
+    ) -> DatasetHandle:
+        with self._lock:
+            if key not in self._handles:
+                self._handles[key] = DatasetHandle(name, loader)
+            return self._handles[key]
+
+    def handle(
+        self,
+        name: str,
+        columns: Optional[List[str]] = None,
+        compact: Optional[bool] = None,
+    ) -> DatasetHandle:
+        """
+        Return the handle of a raw dataset, see ``load_dataset``.
+
+        Each combination of columns and compact mode has its own handle.
+        """
+        key = ("raw", name, tuple(columns) if columns else None, compact)
+        return self._handle(
+            key, name, lambda: load_dataset(name, columns=columns, compact=compact)
+        )
+
+    def processed(
+        self,
+        name: str,
+        text_field: str,
+        columns: Optional[List[str]] = None,
+        compact: Optional[bool] = None,
+    ) -> DatasetHandle:
+        """Return the handle of a processed dataset, see ``load_processed_dataset``."""
+        key = (
+            "processed",
+            name,
+            text_field,
+            tuple(columns) if columns else None,
+            compact,
+        )
+        return self._handle(
+            key,
+            name,
+            lambda: load_processed_dataset(name, text_field, columns, compact),
+        )
+
+    def materialize(self, handles: Dict[str, DatasetHandle]) -> Dict[str, pd.DataFrame]:
+        """
+        Load several handles, in parallel threads for those not yet loaded.
+
+        Returns:
+            Dictionary mapping names to DataFrames, without failed loads
+        """
+        pending = [h for h in handles.values() if not h.loaded]
+        if len(pending) > 1:
+            with ThreadPoolExecutor(min(self.max_workers, len(pending))) as executor:
+                list(executor.map(DatasetHandle.get, pending))
+        loaded = {name: handle.get() for name, handle in handles.items()}
+        return {name: df for name, df in loaded.items() if df is not None}
+
+    def get(
+        self,
+        name: str,
+        columns: Optional[List[str]] = None,
+        compact: Optional[bool] = None,
+    ) -> Optional[pd.DataFrame]:
+        """Return one raw dataset, loading it on first access."""
+        return self.handle(name, columns, compact).get()
+
+    def get_many(
+        self,
+        names: Optional[List[str]] = None,
+        columns: Optional[Dict[str, Optional[List[str]]]] = None,
+        compact: Optional[bool] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Return several raw datasets, loading missing ones in parallel.
+
+        Args:
+            names: Datasets to return, defaults to all known datasets
+            columns: Optional column projection per dataset name
+            compact: Use compact dtypes, see ``load_dataset``
+        """
+        return self.materialize(
+            {
+                name: self.handle(name, (columns or {}).get(name), compact)
+                for name in names or self.names
+            }
+        )
+
+    def clear(self) -> None:
+        """Forget all handles and their cached DataFrames."""
+        with self._lock:
+            self._handles.clear()
+
+
+# One registry per process, created on first use
+_registry: Optional[DatasetRegistry] = None
+
+
+def get_registry() -> DatasetRegistry:
+    """Return the process-wide dataset registry."""
+    global _registry
+    if _registry is None:
+        _registry = DatasetRegistry(max_workers=get_config().DATASET_LOAD_WORKERS)
+    return _registry
+
+
+def load_all_datasets(
+    columns: Optional[Dict[str, Optional[List[str]]]] = None,
+    compact: Optional[bool] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Load all available cybersecurity datasets.
+
+    Datasets are loaded in parallel through the process-wide registry, so
+    repeated calls return the cached DataFrames.
+
+    Args:
+        columns: Optional column projection per dataset name; datasets
+            without an entry load all columns
+        compact: Use compact dtypes, see ``load_dataset``
+
+    Returns:
+        Dictionary mapping dataset names to DataFrames
+    """
+    logger.info("Loading all cybersecurity datasets...")
+
+    datasets = get_registry().get_many(DATASET_NAMES, columns, compact)
+
+    for dataset_name in DATASET_NAMES:
+        df = datasets.get(dataset_name)
+        if df is not None:
+            memory_mb = df.memory_usage(deep=True).sum() / 1024**2
+            logger.info(
+                f"Successfully loaded {dataset_name}: {len(df)} records, {memory_mb:.1f} MB"
+            )
+        else:
+            logger.warning(f"Failed to load dataset: {dataset_name}")
+
+    total_records = sum(len(df) for df in datasets.values())
+    total_memory = (
+        sum(df.memory_usage(deep=True).sum() for df in datasets.values()) / 1024**2
+    )
+
+    logger.info(
+        f"Dataset loading complete: {len(datasets)}/{len(DATASET_NAMES)} "
+        "datasets successfully loaded"
+    )
+    logger.info(
+        f"Total records: {total_records:,}, Total memory: {total_memory:.1f} MB"
+    )
+
+    return datasets
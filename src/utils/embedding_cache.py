@@ -0,0 +1,141 @@
+"""
+Persistent embedding cache for the ChromaDB vector database builder.
+Stores vectors keyed by the hash of the normalized text and the model name
+as a memory-mapped float32 array with a fixed-width key index next to it.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+KEY_BYTES = 32  # sha256 digest
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only changes hit the same entry."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk cache of embeddings for one model.
+
+    Layout inside ``cache_dir/<model_name>/``:
+        - ``vectors.f32``: row-major float32 matrix, one row per entry
+        - ``keys.bin``: one 32-byte key per row, in the same order
+        - ``meta.json``: model name and vector dimension
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str):
+        """Open (or create) the cache for ``model_name`` under ``cache_dir``."""
+        self.model_name = model_name
+        self.path = Path(cache_dir) / model_name.replace("/", "_")
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.vectors_file = self.path / "vectors.f32"
+        self.keys_file = self.path / "keys.bin"
+        self.meta_file = self.path / "meta.json"
+
+        self.dim: Optional[int] = None
+        self.index: Dict[bytes, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self._vectors: Optional[np.memmap] = None
+        self._load()
+
+    def _load(self) -> None:
+        """Read the key index and check it against the vector file."""
+        if not self.meta_file.exists():
+            return
+        with open(self.meta_file, "r", encoding="utf-8") as f:
+            self.dim = json.load(f)["dim"]
+
+        keys = self.keys_file.read_bytes() if self.keys_file.exists() else b""
+        vector_bytes = (
+            self.vectors_file.stat().st_size if self.vectors_file.exists() else 0
+        )
+        row_bytes = 4 * self.dim
+        # An interrupted append may leave one file longer than the other
+        rows = min(len(keys) // KEY_BYTES, vector_bytes // row_bytes)
+        if len(keys) != rows * KEY_BYTES or vector_bytes != rows * row_bytes:
+            for file, size in [
+                (self.keys_file, rows * KEY_BYTES),
+                (self.vectors_file, rows * row_bytes),
+            ]:
+                with open(file, "ab") as f:
+                    f.truncate(size)
+            keys = keys[: rows * KEY_BYTES]
+
+        self.index = {keys[i * KEY_BYTES : (i + 1) * KEY_BYTES]: i for i in range(rows)}
+
+    def key(self, text: str) -> bytes:
+        """Return the cache key of a text for this cache's model."""
+        payload = f"{self.model_name}\0{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).digest()
+
+    def _matrix(self) -> np.memmap:
+        """Memory-map the vector file, reopening it after appends."""
+        rows = len(self.index)
+        if self._vectors is None or self._vectors.shape[0] < rows:
+            self._vectors = np.memmap(
+                self.vectors_file, dtype=np.float32, mode="r", shape=(rows, self.dim)
+            )
+        return self._vectors
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for a list of texts.
+
+        Returns:
+            One vector per text, or None where the text is not cached
+        """
+        rows = [self.index.get(self.key(text)) for text in texts]
+        found = sum(row is not None for row in rows)
+        self.hits += found
+        self.misses += len(texts) - found
+        if not found:
+            return [None] * len(texts)
+
+        matrix = self._matrix()
+        return [None if row is None else np.array(matrix[row]) for row in rows]
+
+    def put_many(self, texts: List[str], embeddings: List[np.ndarray]) -> None:
+        """Append embeddings for texts that are not cached yet."""
+        new_keys = {}
+        new_vectors = []
+        for text, embedding in zip(texts, embeddings):
+            key = self.key(text)
+            if key in self.index or key in new_keys:
+                continue
+            new_keys[key] = len(new_keys)
+            new_vectors.append(np.asarray(embedding, dtype=np.float32))
+        if not new_keys:
+            return
+
+        matrix = np.vstack(new_vectors)
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+            with open(self.meta_file, "w", encoding="utf-8") as f:
+                json.dump({"model_name": self.model_name, "dim": self.dim}, f)
+
+        # Vectors first: keys without vectors are ignored on the next load
+        with open(self.vectors_file, "ab") as f:
+            f.write(matrix.tobytes())
+        with open(self.keys_file, "ab") as f:
+            f.write(b"".join(new_keys))
+
+        start = len(self.index)
+        for key, offset in new_keys.items():
+            self.index[key] = start + offset
+
+    def stats(self) -> Dict[str, float]:
+        """Return entry count and hit statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
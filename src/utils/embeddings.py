@@ -0,0 +1,75 @@
+"""
+Embedding utilities for the ChromaDB vector database builder.
+Computes document embeddings outside of Chroma so they can run in worker processes.
+"""
+
+from typing import Any, List, Optional
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+from chromadb.utils import embedding_functions
+
+# Model behind Chroma's default embedding function
+EMBEDDING_MODEL_NAME = embedding_functions.ONNXMiniLM_L6_V2.MODEL_NAME
+EMBEDDING_DIMENSIONS = 384
+
+# The model reads 256 tokens, two of which are [CLS] and [SEP]
+MAX_CHUNK_TOKENS = 254
+
+# One embedding function and tokenizer per process, loaded on first use
+_embedding_function: Optional[EmbeddingFunction] = None
+_tokenizer: Optional[Any] = None
+
+
+def get_embedding_function() -> EmbeddingFunction:
+    """Return the process-wide default Chroma embedding function."""
+    global _embedding_function
+    if _embedding_function is None:
+        _embedding_function = embedding_functions.DefaultEmbeddingFunction()
+    return _embedding_function
+
+
+def embed_documents(documents: List[str]) -> List[np.ndarray]:
+    """
+    Embed a batch of documents with the default Chroma embedding model.
+
+    Produces the same vectors Chroma computes for ``collection.add(documents=...)``
+    so precomputed embeddings and query-time embeddings stay compatible.
+
+    Args:
+        documents: Texts to embed
+
+    Returns:
+        One float32 vector per document
+    """
+    return [
+        np.asarray(e, dtype=np.float32) for e in get_embedding_function()(documents)
+    ]
+
+
+def get_tokenizer() -> Optional[Any]:
+    """
+    Return the WordPiece tokenizer of the default embedding model.
+
+    The tokenizer is loaded from the model files Chroma downloads for
+    embedding, with truncation and padding turned off so it reports every
+    token of a text. It comes from the ``tokenizer`` property of
+    ``ONNXMiniLM_L6_V2`` in the chromadb version pinned in requirements.txt.
+
+    Returns:
+        A ``tokenizers.Tokenizer``, or None if the model files cannot be loaded
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        try:
+            from tokenizers import Tokenizer
+
+            # Embedding a text makes Chroma download the model files if needed
+            model = embedding_functions.ONNXMiniLM_L6_V2()
+            model(["tokenizer"])
+            _tokenizer = Tokenizer.from_str(model.tokenizer.to_str())
+            _tokenizer.no_truncation()
+            _tokenizer.no_padding()
+        except Exception:
+            return None
+    return _tokenizer
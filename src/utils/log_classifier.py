@@ -3,18 +3,22 @@ Core log classification logic using ChromaDB and pattern matching.
 Clean, focused implementation without defensive error handling.
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 from .chromadb_client import ChromaDBClient
 from .mitre_mapper import map_content_to_mitre_techniques, expand_technique_mapping
 
 
-def classify_single_log(log: Dict, chromadb_client: ChromaDBClient) -> Dict:
+def classify_single_log(
+    log: Dict, chromadb_client: ChromaDBClient, similar_results: Optional[Dict] = None
+) -> Dict:
     """
     Classify a single log entry using ChromaDB similarity search.
 
     Args:
         log: Log entry with content, timestamp, labels
         chromadb_client: ChromaDB client instance
+        similar_results: Query results fetched beforehand, e.g. by
+            ``classify_log_batch``; queried here if not given
 
     Returns:
         Classification result with techniques, confidence, method
@@ -23,8 +27,9 @@ def classify_single_log(log: Dict, chromadb_client: ChromaDBClient) -> Dict:
 
     # Try ChromaDB similarity search first
     try:
-        similar_results = search_chromadb_for_patterns(content, chromadb_client)
-        if similar_results and len(similar_results.get("documents", [[]])[0]) > 0:
+        if similar_results is None:
+            similar_results = search_chromadb_for_patterns(content, chromadb_client)
+        if similar_results and len(similar_results.get("ids", [[]])[0]) > 0:
             techniques = extract_techniques_from_similarity(similar_results)
             confidence = calculate_similarity_confidence(similar_results)
 
@@ -33,7 +38,7 @@ def classify_single_log(log: Dict, chromadb_client: ChromaDBClient) -> Dict:
                 "suggested_techniques": techniques,
                 "confidence": confidence,
                 "method": "chromadb_similarity",
-                "similar_count": len(similar_results.get("documents", [[]])[0]),
+                "similar_count": len(similar_results["ids"][0]),
             }
     except Exception:
         pass  # Fall through to pattern matching
@@ -51,24 +56,45 @@ def classify_single_log(log: Dict, chromadb_client: ChromaDBClient) -> Dict:
     }
 
 
-def classify_log_batch(logs: List[Dict], chromadb_client: ChromaDBClient) -> List[Dict]:
+def classify_log_batch(
+    logs: List[Dict],
+    chromadb_client: ChromaDBClient,
+    collection_name: str = "mitre_techniques",
+) -> List[Dict]:
     """
     Classify a batch of logs.
 
+    The similarity searches of all logs are sent together through
+    ``ChromaDBClient.query_many``.
+
     Args:
         logs: List of log entries
         chromadb_client: ChromaDB client instance
+        collection_name: ChromaDB collection to search
 
     Returns:
         List of classification results
     """
-    return [classify_single_log(log, chromadb_client) for log in logs]
+    hits = chromadb_client.query_many(
+        collection_name,
+        [log["content"] for log in logs],
+        n_results=5,
+    )
+    return [
+        classify_single_log(
+            log,
+            chromadb_client,
+            {key: [values] for key, values in hit.items()} if hit else {},
+        )
+        for log, hit in zip(logs, hits)
+    ]
 
 
 def search_chromadb_for_patterns(
     content: str,
     chromadb_client: ChromaDBClient,
     collection_name: str = "mitre_techniques",
+    include: Optional[Sequence[str]] = None,
 ) -> Dict:
     """
     Search ChromaDB for similar cybersecurity patterns.
@@ -77,13 +103,19 @@ def search_chromadb_for_patterns(
         content: Log content to search for
         chromadb_client: ChromaDB client instance
         collection_name: ChromaDB collection to search
+        include: Result fields to fetch, defaults to ``DEFAULT_INCLUDE``
+            (metadatas, documents and distances, all of which the
+            classification reads)
 
     Returns:
         ChromaDB query results
     """
     # Query ChromaDB for similar content
     results = chromadb_client.query(
-        collection_name=collection_name, query_texts=[content], n_results=5
+        collection_name=collection_name,
+        query_texts=[content],
+        n_results=5,
+        include=include,
     )
 
     return results or {}
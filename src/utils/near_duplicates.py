@@ -0,0 +1,170 @@
+"""
+Near-duplicate detection for the ChromaDB vector database builder.
+Folds documents whose MinHash-estimated Jaccard similarity of word shingles
+reaches a threshold, and whose metadata labels match, into the first document
+seen. LSH banding finds the candidates; only the band keys are kept.
+"""
+
+import re
+import zlib
+from collections import Counter, defaultdict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"\w+")
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Metadata fields that identify a row rather than label it; they are ignored
+# when deciding whether two documents carry the same labels
+ROW_FIELDS = ("original_index", "row_id")
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Choose LSH bands and rows per band for a similarity threshold.
+
+    Picks the split of ``num_perm`` whose S-curve midpoint
+    ``(1 / bands) ** (1 / rows)`` is closest to ``threshold``.
+
+    Returns:
+        Tuple of (bands, rows)
+    """
+    splits = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(splits, key=lambda s: abs((1 / s[0]) ** (1 / s[1]) - threshold))
+
+
+def label_key(
+    metadata: Optional[Dict[str, Any]], ignore: Sequence[str] = ROW_FIELDS
+) -> Hashable:
+    """Return a hashable key of a document's metadata without row identifiers."""
+    return tuple(
+        sorted(
+            (key, str(value))
+            for key, value in (metadata or {}).items()
+            if key not in ignore
+        )
+    )
+
+
+class NearDuplicateIndex:
+    """
+    Streaming MinHash/LSH index of representative documents.
+
+    Per representative only its id and one integer per LSH band are kept.
+    The similarity to a candidate is estimated from the share of bands the
+    two documents have in common: a band matches with probability
+    ``similarity ** rows``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            threshold: Estimated Jaccard similarity at which a document is
+                folded into an earlier representative
+            num_perm: Number of MinHash permutations
+            shingle_size: Words per shingle
+            seed: Seed of the permutation parameters
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 61, num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 61, num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[int, List[int]]] = [
+            defaultdict(list) for _ in range(self.bands)
+        ]
+        self._ids: List[str] = []
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the MinHash signature of a text's word shingles."""
+        words = WORD_PATTERN.findall(text.lower())
+        size = min(self.shingle_size, max(1, len(words)))
+        shingles = {
+            " ".join(words[i : i + size]) for i in range(len(words) - size + 1)
+        } or {""}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # Universal hashing; uint64 overflow wraps, as in datasketch
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        return (permuted & MAX_HASH).min(axis=0)
+
+    def add(self, doc_id: str, text: str, labels: Hashable = None) -> Optional[str]:
+        """
+        Add a document, or fold it into a similar representative.
+
+        Args:
+            doc_id: Document id
+            text: Document text
+            labels: Key of the document's labels; documents are only folded
+                into representatives with equal labels
+
+        Returns:
+            The representative's id if the document is a near duplicate,
+            otherwise None (the document becomes a representative)
+        """
+        signature = self.signature(text)
+        keys = [
+            hash(
+                (labels, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            )
+            for band in range(self.bands)
+        ]
+
+        matches = Counter()
+        for buckets, key in zip(self._buckets, keys):
+            matches.update(buckets.get(key, ()))
+        if matches:
+            # Most shared bands first, earliest representative on ties
+            candidate, shared = min(matches.items(), key=lambda m: (-m[1], m[0]))
+            if (shared / self.bands) ** (1 / self.rows) >= self.threshold:
+                return self._ids[candidate]
+
+        position = len(self._ids)
+        self._ids.append(doc_id)
+        for buckets, key in zip(self._buckets, keys):
+            buckets[key].append(position)
+        return None
+
+    def filter(
+        self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]
+    ) -> Tuple[List[str], List[Dict[str, Any]], List[str], Dict[str, str]]:
+        """
+        Drop near duplicates from prepared documents.
+
+        Documents are only folded into representatives whose metadata matches
+        apart from the row identifiers in ``ROW_FIELDS``, so rows with the
+        same text but different labels stay retrievable.
+
+        Returns:
+            Tuple of (documents, metadatas, ids) of the kept documents and a
+            mapping of each folded id to its representative id
+        """
+        kept_docs, kept_metadatas, kept_ids = [], [], []
+        folded = {}
+        for document, metadata, doc_id in zip(documents, metadatas, ids):
+            representative = self.add(doc_id, document, label_key(metadata))
+            if representative is None:
+                kept_docs.append(document)
+                kept_metadatas.append(metadata)
+                kept_ids.append(doc_id)
+            else:
+                folded[doc_id] = representative
+        return kept_docs, kept_metadatas, kept_ids, folded
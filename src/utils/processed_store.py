@@ -0,0 +1,125 @@
+"""
+Processed dataset snapshots for the Cybersecurity RAG System.
+Stores cleaned document tables as uncompressed Arrow IPC (Feather v2) files
+that later stages memory-map instead of decoding the raw Parquet files again.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Bump when the processing rules change so existing snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+FINGERPRINT_KEY = b"fingerprint"
+
+
+def file_sha256(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024**2), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_files(
+    files: Iterable[Path],
+    params: Dict[str, Any],
+    digest_file: Optional[Path] = None,
+) -> str:
+    """
+    Return a content fingerprint of source files and processing parameters.
+
+    Args:
+        files: Source files, hashed by name and content
+        params: JSON-serializable processing parameters
+        digest_file: Optional JSON file remembering each file's SHA-256 with
+            its size and modification time; files whose size and mtime are
+            unchanged are not read again
+
+    Returns:
+        SHA-256 hex digest
+    """
+    known: Dict[str, Dict[str, Any]] = {}
+    if digest_file is not None and digest_file.exists():
+        try:
+            with open(digest_file, "r") as f:
+                known = json.load(f)
+        except (OSError, ValueError):
+            known = {}
+
+    file_digests = {}
+    for path in files:
+        stat = Path(path).stat()
+        entry = known.get(str(path))
+        if not (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            entry = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": file_sha256(path),
+            }
+        file_digests[str(path)] = entry
+
+    if digest_file is not None and file_digests != known:
+        digest_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = digest_file.with_suffix(digest_file.suffix + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(file_digests, f, indent=2)
+        tmp_file.replace(digest_file)
+
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps([SNAPSHOT_VERSION, params], sort_keys=True, default=str).encode()
+    )
+    for path, entry in file_digests.items():
+        digest.update(Path(path).name.encode())
+        digest.update(entry["sha256"].encode())
+    return digest.hexdigest()
+
+
+def write_snapshot(path: Path, table: pa.Table, fingerprint: str) -> None:
+    """
+    Atomically write a table as an uncompressed Arrow IPC file.
+
+    The fingerprint is stored in the schema metadata. Compression is disabled
+    so readers can memory-map the buffers without copying them.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    metadata = {**(table.schema.metadata or {}), FINGERPRINT_KEY: fingerprint.encode()}
+    tmp_file = path.with_suffix(path.suffix + ".tmp")
+    feather.write_feather(
+        table.replace_schema_metadata(metadata), tmp_file, compression="uncompressed"
+    )
+    tmp_file.replace(path)
+
+
+def read_snapshot(path: Path, fingerprint: Optional[str] = None) -> Optional[pa.Table]:
+    """
+    Memory-map a snapshot written by :func:`write_snapshot`.
+
+    The returned table references the mapped file directly; pages are read
+    by the OS on first access.
+
+    Args:
+        path: Snapshot file
+        fingerprint: Expected fingerprint; a snapshot with another one is stale
+
+    Returns:
+        The table, or None if the file is missing or stale
+    """
+    if not path.exists():
+        return None
+    source = pa.memory_map(str(path), "r")
+    table = pa.ipc.open_file(source).read_all()
+    stored = (table.schema.metadata or {}).get(FINGERPRINT_KEY)
+    if fingerprint is not None and stored != fingerprint.encode():
+        return None
+    return table
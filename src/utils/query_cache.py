@@ -0,0 +1,100 @@
+"""
+In-memory query result cache for the ChromaDB client.
+Keeps the hits of recent query texts per collection with LRU eviction and a
+time to live, so repeated log messages do not trigger identical queries.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, Optional, Tuple
+
+from .embedding_cache import normalize_text
+
+
+class QueryResultCache:
+    """Thread-safe, size-bounded LRU cache of query results with a TTL."""
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl_seconds: Age after which an entry is treated as a miss
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(
+        collection: str,
+        text: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None,
+        include: Tuple[str, ...] = (),
+    ) -> Tuple:
+        """Build the cache key of one query text; the collection comes first."""
+        where_key = json.dumps(where, sort_keys=True) if where else None
+        return (collection, normalize_text(text), n_results, where_key, include)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Return a cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, collection: str) -> int:
+        """Drop all entries of a collection and return how many were dropped."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == collection]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit rate, size and eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,81 @@
+"""
+Pytest configuration and shared fixtures.
+
+Tests run against temporary embedded ChromaDB indexes. The ONNX embedding
+model is replaced by a deterministic hash embedding, so no model download is
+needed and identical texts always get identical vectors.
+"""
+
+import hashlib
+import importlib.util
+import sys
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+
+# Tests import ``src.utils``; the numbered pipeline scripts import ``utils``
+for path in (SRC, ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from src.utils.chromadb_client import ChromaDBClient  # noqa: E402
+from src.utils.config import Config  # noqa: E402
+
+EMBEDDING_DIMENSIONS = 384
+
+
+def stub_embed(texts: List[str]) -> List[np.ndarray]:
+    """Embed texts as unit vectors derived from their SHA-256 digest."""
+    vectors = []
+    for text in texts:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        vector = np.frombuffer(digest * 12, dtype=np.uint8)[:EMBEDDING_DIMENSIONS]
+        vector = vector.astype(np.float32) + 1.0
+        vectors.append(vector / np.linalg.norm(vector))
+    return vectors
+
+
+@pytest.fixture(autouse=True)
+def stub_embedding_function(monkeypatch):
+    """Replace Chroma's default embedding model with :func:`stub_embed`."""
+    monkeypatch.setattr(
+        ONNXMiniLM_L6_V2, "__call__", lambda self, input: stub_embed(input)
+    )
+
+
+@pytest.fixture
+def chroma_config(tmp_path):
+    """Configuration for an embedded ChromaDB index in a temporary directory."""
+    return Config(
+        CHROMADB_MODE="embedded",
+        CHROMADB_PATH=str(tmp_path / "chromadb"),
+        CHROMADB_QUERY_CACHE_ENABLED=True,
+        CHROMADB_WRITE_BACKOFF=0.0,
+    )
+
+
+@pytest.fixture
+def chroma_client(chroma_config):
+    """Connected ChromaDBClient on a temporary embedded index."""
+    client = ChromaDBClient(chroma_config)
+    assert client.connect()
+    return client
+
+
+@pytest.fixture
+def load_script():
+    """Return a loader for the numbered pipeline scripts in ``src``."""
+
+    def load(name: str):
+        spec = importlib.util.spec_from_file_location(name, SRC / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
@@ -0,0 +1,107 @@
+"""Tests for the asyncio ChromaDB client."""
+
+import asyncio
+import threading
+import time
+
+from src.utils.async_chromadb_client import AsyncChromaDBClient
+
+DOCUMENTS = [f"Outbound connection to rare domain number {i}" for i in range(10)]
+
+
+def run(coroutine):
+    """Run a coroutine to completion on a fresh event loop."""
+    return asyncio.run(coroutine)
+
+
+def test_queries_match_the_blocking_client(chroma_client):
+    """Async query and query_many return what the wrapped client returns."""
+    chroma_client.add_documents("logs", DOCUMENTS)
+
+    async def main():
+        async with AsyncChromaDBClient(client=chroma_client) as client:
+            single = await client.query("logs", [DOCUMENTS[2]], n_results=2)
+            many = await client.query_many(
+                "logs", DOCUMENTS[:4] * 2, n_results=2, batch_size=3
+            )
+        return single, many
+
+    single, many = run(main())
+
+    assert single == chroma_client.query("logs", [DOCUMENTS[2]], n_results=2)
+    assert many == chroma_client.query_many("logs", DOCUMENTS[:4] * 2, n_results=2)
+
+
+def test_add_documents_writes_through_the_wrapped_client(chroma_client):
+    """Documents added asynchronously are stored once."""
+
+    async def main():
+        async with AsyncChromaDBClient(client=chroma_client) as client:
+            added = await client.add_documents("logs", DOCUMENTS)
+            report = await client.bulk_add_documents("logs", DOCUMENTS, chunk_size=4)
+        return added, report
+
+    added, report = run(main())
+
+    assert added
+    assert report.skipped == len(DOCUMENTS)
+    assert chroma_client.get_collection_info("logs")["count"] == len(DOCUMENTS)
+
+
+def test_concurrency_is_bounded(chroma_client, monkeypatch):
+    """No more than max_concurrency blocking calls run at once."""
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_query(*args):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+        return {"ids": [[]]}
+
+    monkeypatch.setattr(chroma_client, "query", slow_query)
+
+    async def main():
+        async with AsyncChromaDBClient(client=chroma_client, max_concurrency=3) as c:
+            await asyncio.gather(*(c.query("logs", [str(i)]) for i in range(12)))
+
+    run(main())
+
+    assert max(peak) == 3
+
+
+def test_exit_does_not_block_the_event_loop(chroma_client):
+    """Leaving the context waits for running calls off the event loop."""
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        async with AsyncChromaDBClient(client=chroma_client) as client:
+            client._executor.submit(time.sleep, 0.1)
+        await task
+
+    run(main())
+
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.08
+
+
+def test_health_check_reports_concurrency(chroma_client):
+    """The async health check adds the concurrency limit."""
+
+    async def main():
+        async with AsyncChromaDBClient(client=chroma_client, max_concurrency=2) as c:
+            return await c.health_check()
+
+    health = run(main())
+
+    assert health["status"] == "healthy"
+    assert health["max_concurrency"] == 2
@@ -0,0 +1,56 @@
+"""Tests for adaptive, character-budgeted batch sizing."""
+
+import pytest
+
+from src.utils.batching import AdaptiveBatcher
+
+
+def test_first_batch_uses_initial_docs():
+    """Before any measurement batches hold initial_docs documents."""
+    batcher = AdaptiveBatcher(initial_docs=3)
+    batcher.set_documents(["x" * 10] * 7)
+
+    assert [batcher.next_end(0), batcher.next_end(3), batcher.next_end(6)] == [3, 6, 7]
+    assert batcher.settled_docs == 3
+
+
+def test_batches_are_split_by_character_budget():
+    """After a measurement batches hold as many characters as the budget."""
+    batcher = AdaptiveBatcher(initial_docs=1, target_seconds=1.0, min_chars=1)
+    batcher.set_documents(["a" * 100, "b" * 100, "c" * 300, "d" * 100, "e" * 100])
+    batcher.record(docs=1, chars=100, seconds=0.5)
+
+    assert batcher.char_budget == 200
+    assert batcher.next_end(0) == 2
+    assert batcher.next_end(2) == 3  # A long document still forms a batch
+    assert batcher.next_end(3) == 5
+
+
+def test_budget_moves_toward_measured_throughput():
+    """Later measurements are blended with the previous budget."""
+    batcher = AdaptiveBatcher(initial_docs=10, target_seconds=2.0, min_chars=1)
+    batcher.record(docs=10, chars=1000, seconds=1.0)
+    batcher.record(docs=10, chars=1000, seconds=0.5)
+
+    assert batcher.char_budget == pytest.approx(0.5 * 2000 + 0.5 * 4000)
+    assert batcher.settled_docs == 30
+
+
+def test_budget_and_batch_size_are_capped():
+    """The budget stays within its bounds and batches within max_docs."""
+    batcher = AdaptiveBatcher(initial_docs=50, max_docs=4, max_chars=500)
+    batcher.set_documents(["x"] * 10)
+    batcher.record(docs=4, chars=4, seconds=0.000001)
+
+    assert batcher.char_budget == 500
+    assert batcher.next_end(0) == 4
+    assert AdaptiveBatcher(initial_docs=50, max_docs=4).initial_docs == 4
+
+
+def test_zero_latency_keeps_budget():
+    """Batches without a usable latency are counted but do not adapt."""
+    batcher = AdaptiveBatcher(initial_docs=5)
+    batcher.record(docs=5, chars=500, seconds=0.0)
+
+    assert batcher.char_budget is None
+    assert batcher.total_chars == 500
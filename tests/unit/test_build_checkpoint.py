@@ -0,0 +1,82 @@
+"""Tests for checkpointed, resumable vector database builds."""
+
+import pandas as pd
+import pytest
+
+DATASET = "security_attacks"
+
+
+@pytest.fixture
+def build(load_script):
+    """The ``04_build_chromadb`` script module."""
+    return load_script("04_build_chromadb")
+
+
+@pytest.fixture
+def builder(build, chroma_config):
+    """Builder connected to a temporary index."""
+    builder = build.ChromaDBBuilder(chroma_config)
+    assert builder.connect_to_chromadb()
+    return builder
+
+
+@pytest.fixture
+def embed_calls(build, monkeypatch):
+    """Record the batches the builder embeds; ``fail_on`` makes one call fail."""
+    calls = {"batches": [], "fail_on": None}
+    embed_documents = build.embed_documents
+
+    def embed(texts):
+        calls["batches"].append(len(texts))
+        if len(calls["batches"]) == calls["fail_on"]:
+            raise RuntimeError("embedding worker died")
+        return embed_documents(texts)
+
+    monkeypatch.setattr(build, "embed_documents", embed)
+    return calls
+
+
+def attacks(count, start=0):
+    """Attack pattern rows as the security_attacks dataset provides them."""
+    return pd.DataFrame(
+        {
+            "text": [f"Attack pattern description number {i}" for i in range(count)],
+            "label": [f"T{1000 + i % 7}" for i in range(count)],
+        },
+        index=range(start, start + count),
+    )
+
+
+def test_interrupted_build_resumes_after_checkpoint(builder, embed_calls):
+    """A resumed build only embeds and writes what the checkpoint lacks."""
+    collection = builder.create_collection(DATASET)
+    embed_calls["fail_on"] = 2
+
+    assert not builder.add_documents_to_collection(DATASET, attacks(250))
+    state = builder.load_checkpoint()["attack_patterns"]
+    assert not state["complete"]
+    assert state["written"] == collection.count() == embed_calls["batches"][0]
+
+    embed_calls.update(batches=[], fail_on=None)
+    builder.checkpoint = builder.load_checkpoint()
+    assert builder.add_documents_to_collection(DATASET, attacks(250), resume=True)
+
+    assert collection.count() == 250
+    assert sum(embed_calls["batches"]) == 250 - state["written"]
+    state = builder.load_checkpoint()["attack_patterns"]
+    assert state["complete"]
+    assert state["written"] == 250
+
+
+def test_resume_rejects_checkpoint_of_other_data(builder, embed_calls):
+    """Resuming with data that does not match the checkpoint fails."""
+    builder.create_collection(DATASET)
+    embed_calls["fail_on"] = 2
+    builder.add_documents_to_collection(DATASET, attacks(250))
+
+    embed_calls["fail_on"] = None
+    builder.checkpoint = builder.load_checkpoint()
+
+    assert not builder.add_documents_to_collection(
+        DATASET, attacks(250, start=1), resume=True
+    )
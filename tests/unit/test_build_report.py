@@ -0,0 +1,41 @@
+"""Tests for vector database build statistics."""
+
+from src.utils import build_report
+from src.utils.build_report import CollectionBuildStats
+
+
+def test_rss_is_sampled_per_collection(monkeypatch):
+    """Collection memory is the peak sample and its growth over the start."""
+    samples = iter([500.0, 620.0, 580.0])
+    monkeypatch.setattr(build_report, "current_rss_mb", lambda: next(samples))
+    stats = CollectionBuildStats("logs")
+
+    for _ in range(3):
+        stats.sample_rss()
+
+    report = stats.to_dict()
+    assert report["rss_start_mb"] == 500.0
+    assert report["rss_peak_mb"] == 620.0
+    assert report["rss_growth_mb"] == 120.0
+
+
+def test_rss_is_omitted_where_unavailable(monkeypatch):
+    """Platforms without a current RSS reading report None."""
+    monkeypatch.setattr(build_report, "current_rss_mb", lambda: None)
+    stats = CollectionBuildStats("logs")
+    stats.sample_rss()
+
+    assert stats.to_dict()["rss_growth_mb"] is None
+
+
+def test_batches_split_embed_and_write_time():
+    """Batch latency is the sum of its embed and write time."""
+    stats = CollectionBuildStats("logs")
+    stats.add_batch(10, embed_seconds=0.25, write_seconds=0.5)
+    stats.add_batch(5, embed_seconds=0.5, write_seconds=0.25)
+
+    report = stats.to_dict()
+    assert report["documents"] == 15
+    assert report["embed_seconds"] == 0.75
+    assert report["write_seconds"] == 0.75
+    assert report["batch_latency_ms"]["max"] == 750.0
@@ -0,0 +1,130 @@
+"""Tests for chunked, retried bulk writes to ChromaDB."""
+
+import chromadb
+import pytest
+
+from src.utils.bulk_writer import bulk_add, document_ids, retry_failed_chunks
+
+
+class FlakyCollection:
+    """Collection wrapper whose ``add`` fails on chosen calls."""
+
+    def __init__(self, collection, fail_calls, error=ConnectionError):
+        self.collection = collection
+        self.name = collection.name
+        self.fail_calls = set(fail_calls)
+        self.error = error
+        self.calls = 0
+
+    def get(self, **kwargs):
+        return self.collection.get(**kwargs)
+
+    def add(self, **kwargs):
+        self.calls += 1
+        if self.calls in self.fail_calls:
+            raise self.error("connection reset")
+        return self.collection.add(**kwargs)
+
+
+@pytest.fixture
+def collection(tmp_path):
+    """Empty collection in a temporary embedded index."""
+    client = chromadb.PersistentClient(path=str(tmp_path / "chromadb"))
+    return client.create_collection("bulk")
+
+
+def documents(count):
+    """Distinct document texts."""
+    return [f"Suspicious process event number {i}" for i in range(count)]
+
+
+def test_document_ids_depend_on_text_and_metadata():
+    """Equal documents get equal ids; metadata is part of the id."""
+    ids = document_ids(["a", "a", "b"], [{"k": 1}, {"k": 1}, {"k": 1}])
+
+    assert ids[0] == ids[1] != ids[2]
+    assert document_ids(["a"], [{"k": 2}]) != ids[:1]
+    assert document_ids(["a", "a"]) == document_ids(["a", "a"])
+
+
+def test_writes_all_documents_in_chunks(collection):
+    """Documents are split into chunks of at most chunk_size."""
+    report = bulk_add(collection, documents(25), chunk_size=10, max_workers=2)
+
+    assert report.ok
+    assert [chunk.documents for chunk in report.chunks] == [10, 10, 5]
+    assert report.written == 25
+    assert collection.count() == 25
+
+
+def test_repeated_and_stored_documents_are_skipped(collection):
+    """Repeats within a call and documents already stored are not added."""
+    first = bulk_add(collection, ["same text", "same text", "other text"])
+    second = bulk_add(collection, ["same text", "new text"])
+
+    assert (first.written, first.skipped, first.duplicates) == (2, 1, 1)
+    assert (second.written, second.skipped, second.duplicates) == (1, 1, 0)
+    assert collection.count() == 3
+
+
+def test_transient_errors_are_retried(collection):
+    """A chunk failing with a transient error succeeds on a later attempt."""
+    flaky = FlakyCollection(collection, fail_calls={1, 2})
+
+    report = bulk_add(
+        flaky, documents(10), chunk_size=10, max_workers=1, backoff_seconds=0
+    )
+
+    assert report.ok
+    assert report.chunks[0].attempts == 3
+    assert report.to_dict()["retries"] == 2
+    assert collection.count() == 10
+
+
+def test_permanent_errors_fail_without_retry(collection):
+    """A permanent error fails its chunk after one attempt."""
+    flaky = FlakyCollection(collection, fail_calls={1}, error=ValueError)
+
+    report = bulk_add(
+        flaky, documents(10), chunk_size=10, max_workers=1, backoff_seconds=0
+    )
+
+    assert not report.ok
+    assert report.chunks[0].attempts == 1
+    assert report.failed_chunks[0].error == "ValueError: connection reset"
+
+
+def test_partial_failure_reports_failed_chunks_and_retries_them(collection):
+    """Other chunks are written when one fails, and the failed one can be retried."""
+    flaky = FlakyCollection(collection, fail_calls={2, 3})
+
+    report = bulk_add(
+        flaky,
+        documents(30),
+        chunk_size=10,
+        max_workers=1,
+        max_retries=1,
+        backoff_seconds=0,
+    )
+
+    assert [chunk.ok for chunk in report.chunks] == [True, False, True]
+    assert report.written == 20
+    assert report.to_dict()["failures"][0]["start"] == 10
+    assert collection.count() == 20
+
+    retry_failed_chunks(collection, report, backoff_seconds=0)
+
+    assert report.ok
+    assert report.written == 30
+    assert collection.count() == 30
+
+
+def test_client_bulk_add_documents_reports_outcome(chroma_client):
+    """ChromaDBClient writes through the bulk writer and returns its report."""
+    report = chroma_client.bulk_add_documents("logs", documents(12), chunk_size=5)
+
+    assert report.ok
+    assert len(report.chunks) == 3
+    assert chroma_client.get_collection_info("logs")["count"] == 12
+    assert chroma_client.add_documents("logs", documents(12))
+    assert chroma_client.get_collection_info("logs")["count"] == 12
@@ -0,0 +1,129 @@
+"""Tests for ChromaDBClient collection handles, queries and deletes."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.chromadb_client import ChromaDBClient
+from src.utils.collection_aliases import CollectionAliasRegistry, versioned_name
+
+
+def test_client_follows_alias_switch(chroma_config):
+    """A cached handle is replaced once its alias points elsewhere."""
+    chroma_config.CHROMADB_ALIAS_TTL = 0
+    chroma_client = ChromaDBClient(chroma_config)
+    chroma_client.connect()
+    registry = CollectionAliasRegistry(chroma_client.client)
+    for version in ["1", "2"]:
+        chroma_client.client.create_collection(versioned_name("logs", version))
+
+    registry.set_alias("logs", "logs__v1")
+    assert chroma_client.get_or_create_collection("logs").name == "logs__v1"
+
+    registry.set_alias("logs", "logs__v2")
+    assert chroma_client.get_or_create_collection("logs").name == "logs__v2"
+
+
+def test_client_serves_cached_handle_within_ttl(chroma_client):
+    """Within the alias TTL the cached handle is returned without a lookup."""
+    first = chroma_client.get_or_create_collection("logs")
+    second = chroma_client.get_or_create_collection("logs")
+
+    assert second is first
+    assert chroma_client.collection_cache_hits == 1
+    assert chroma_client.collection_cache_misses == 1
+
+
+def blue_green(chroma_client, alias, versions):
+    """Create versioned collections of an alias and point it at the last."""
+    registry = CollectionAliasRegistry(chroma_client.client)
+    for version in versions:
+        collection = chroma_client.client.create_collection(
+            versioned_name(alias, version)
+        )
+        collection.add(ids=[version], documents=[f"{alias} document {version}"])
+    registry.set_alias(alias, versioned_name(alias, versions[-1]))
+    return registry
+
+
+def test_delete_by_alias_removes_versions_and_alias(chroma_client):
+    """Deleting an alias deletes every collection behind it."""
+    registry = blue_green(chroma_client, "rules", ["1", "2"])
+    chroma_client.query("rules", ["rules document"])
+
+    assert chroma_client.delete_collection("rules")
+
+    assert registry.versions("rules") == []
+    assert registry.aliases() == {}
+    assert "rules" not in chroma_client.collections
+    assert chroma_client.query_cache.stats()["entries"] == 0
+
+
+def test_delete_alias_target_removes_alias(chroma_client):
+    """Deleting the collection an alias points to does not leave it dangling."""
+    registry = blue_green(chroma_client, "rules", ["1", "2"])
+
+    assert chroma_client.delete_collection("rules__v2")
+
+    assert registry.versions("rules") == ["rules__v1"]
+    assert registry.resolve("rules") == "rules"
+
+
+def test_delete_superseded_version_keeps_alias(chroma_client):
+    """Deleting an older version leaves the live alias alone."""
+    registry = blue_green(chroma_client, "rules", ["1", "2"])
+
+    assert chroma_client.delete_collection("rules__v1")
+
+    assert registry.resolve("rules") == "rules__v2"
+    assert chroma_client.get_collection_info("rules")["count"] == 1
+
+
+def test_delete_missing_collection_fails(chroma_client):
+    """Deleting a collection that does not exist returns False."""
+    assert not chroma_client.delete_collection("missing")
+
+
+def test_list_collections_shows_aliases_once(chroma_client):
+    """Listing and health checks report aliases instead of their versions."""
+    blue_green(chroma_client, "rules", ["1", "2"])
+    chroma_client.add_documents("logs", ["failed login from admin"])
+
+    assert chroma_client.list_collections() == ["logs", "rules"]
+    health = chroma_client.health_check()
+    assert health["collections"] == ["logs", "rules"]
+    assert health["collection_counts"] == {"logs": 1, "rules": 1}
+
+
+def test_handle_cache_is_shared_safely_between_threads(chroma_config):
+    """Concurrent lookups and invalidations neither fail nor lose counts."""
+    chroma_config.CHROMADB_ALIAS_TTL = 0
+    chroma_client = ChromaDBClient(chroma_config)
+    chroma_client.connect()
+    names = [f"logs_{i}" for i in range(8)]
+    for name in names:
+        chroma_client.get_or_create_collection(name)
+
+    def work(i):
+        name = names[i % len(names)]
+        if i % 5 == 0:
+            chroma_client.invalidate_collection(name)
+            return None
+        return chroma_client.get_or_create_collection(name)
+
+    with ThreadPoolExecutor(8) as executor:
+        handles = list(executor.map(work, range(400)))
+
+    lookups = len(names) + sum(1 for i in range(400) if i % 5)
+    assert all(h is not None for i, h in enumerate(handles) if i % 5)
+    stats = chroma_client.collection_cache_stats()
+    assert stats["hits"] + stats["misses"] == lookups
+
+
+def test_builder_shares_the_client_index(chroma_client, load_script, chroma_config):
+    """The builder opens the same embedded index as a connected client."""
+    builder = load_script("04_build_chromadb").ChromaDBBuilder(chroma_config)
+
+    assert builder.connect_to_chromadb()
+    builder.create_collection("security_attacks")
+    builder.promote_collection("security_attacks")
+
+    assert "attack_patterns" in chroma_client.list_collections()
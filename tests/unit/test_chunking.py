@@ -0,0 +1,105 @@
+"""Tests for token-window chunking and chunk-aware retrieval."""
+
+import pandas as pd
+import pytest
+
+from src.utils.chunking import chunk_documents, chunker_id, merge_chunks, split_text
+
+DATASET = "security_attacks"
+TEXT = " ".join(f"word{i}" for i in range(25))
+
+
+def test_short_text_is_one_chunk():
+    """Texts within max_tokens are not split."""
+    assert split_text("failed login from admin", max_tokens=10) == [(0, 23)]
+
+
+def test_split_text_overlaps_windows():
+    """Windows hold max_tokens tokens and share overlap tokens."""
+    spans = split_text(TEXT, max_tokens=10, overlap=2)
+    words = [TEXT[start:end].split() for start, end in spans]
+
+    assert [len(chunk) for chunk in words] == [10, 10, 9]
+    assert words[0][-2:] == words[1][:2]
+    assert words[-1][-1] == "word24"
+
+
+def test_chunk_documents_keeps_ids_of_short_documents():
+    """Only split documents get chunk ids; all chunks carry their parent."""
+    documents, metadatas, ids = chunk_documents(
+        ["short text", TEXT], [{"label": "a"}, {"label": "b"}], ["1", "2"], 10, 2
+    )
+
+    assert ids == ["1", "2#c0", "2#c1", "2#c2"]
+    assert metadatas[0]["chunk_count"] == 1
+    assert {m["parent_id"] for m in metadatas[1:]} == {"2"}
+    assert all(m["label"] == "b" for m in metadatas[1:])
+    assert documents[2] == TEXT[metadatas[2]["char_start"] : metadatas[2]["char_end"]]
+
+
+def test_merge_chunks_rebuilds_parent():
+    """Overlapping chunks merge back into the parent text in any order."""
+    documents, metadatas, _ = chunk_documents([TEXT], [{}], ["1"], 10, 2)
+
+    assert merge_chunks(list(zip(metadatas, documents))[::-1]) == TEXT
+
+
+def test_chunker_id_names_token_counter_and_windows():
+    """Changing the tokenizer or window sizes changes the chunker id."""
+    assert chunker_id(None, 254, 32) == "regex:254:32"
+    assert chunker_id(object(), 254, 32) == "wordpiece:254:32"
+    assert chunker_id(None, 128, 32) != chunker_id(None, 254, 32)
+
+
+@pytest.fixture
+def chunked(chroma_client):
+    """Client with a collection of one long and one short chunked document."""
+    documents, metadatas, ids = chunk_documents(
+        [TEXT, "failed login from admin"], [{}, {}], ["long", "short"], 10, 2
+    )
+    chroma_client.add_documents("rules", documents, metadatas, ids)
+    return chroma_client
+
+
+def test_query_chunks_returns_one_hit_per_parent(chunked):
+    """Several matching chunks of a parent count as one result."""
+    results = chunked.query_chunks("rules", [TEXT[:40]], n_results=2)
+
+    parents = [m["parent_id"] for m in results["metadatas"][0]]
+    assert sorted(parents) == ["long", "short"]
+
+
+def test_query_chunks_expands_parents(chunked):
+    """With expand_parents a chunk hit is replaced by its whole parent."""
+    results = chunked.query_chunks(
+        "rules", [TEXT[:40]], n_results=2, expand_parents=True
+    )
+
+    assert sorted(results["documents"][0]) == sorted([TEXT, "failed login from admin"])
+
+
+@pytest.fixture
+def builder(load_script, chroma_config):
+    """Builder on a temporary index that chunks the attack patterns."""
+    builder = load_script("04_build_chromadb").ChromaDBBuilder(chroma_config)
+    assert builder.connect_to_chromadb()
+    builder.collection_configs[DATASET]["chunking"] = True
+    return builder
+
+
+def test_changed_chunker_rewrites_incremental_build(builder):
+    """A manifest from another chunker is discarded, so every chunk is rebuilt."""
+    df = pd.DataFrame({"text": [TEXT, "failed login"], "label": ["T1", "T2"]})
+    collection = builder.create_collection(DATASET)
+    assert builder.add_documents_to_collection(DATASET, df)
+    assert collection.count() == 2
+
+    builder.config.CHROMADB_CHUNK_TOKENS = 10
+    builder.config.CHROMADB_CHUNK_OVERLAP = 2
+    assert builder.add_documents_to_collection(DATASET, df, incremental=True)
+
+    ids = collection.get(include=[])["ids"]
+    assert f"{DATASET}_0" not in ids
+    assert f"{DATASET}_0#c0" in ids
+    assert builder.load_manifest("attack_patterns", "regex:200:32") is None
+    assert len(builder.load_manifest("attack_patterns", "regex:10:2")) == len(ids)
@@ -0,0 +1,87 @@
+"""Tests for the collection alias registry and alias resolution in the client."""
+
+import chromadb
+import pytest
+
+from src.utils.collection_aliases import (
+    ALIAS_COLLECTION,
+    CollectionAliasRegistry,
+    alias_name,
+    versioned_name,
+)
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Chroma client on a temporary embedded index."""
+    return chromadb.PersistentClient(path=str(tmp_path / "chromadb"))
+
+
+def test_unaliased_name_resolves_to_itself(client):
+    """Names without an alias are used as they are."""
+    assert CollectionAliasRegistry(client).resolve("mitre_techniques") == (
+        "mitre_techniques"
+    )
+
+
+def test_set_alias_is_seen_by_other_registries(client):
+    """Aliases are stored in Chroma and shared by all registries."""
+    target = versioned_name("mitre_techniques", "20260101000000")
+    CollectionAliasRegistry(client).set_alias("mitre_techniques", target)
+
+    registry = CollectionAliasRegistry(client)
+    assert registry.resolve("mitre_techniques") == target
+    assert registry.aliases() == {"mitre_techniques": target}
+
+
+def test_set_alias_replaces_previous_target(client):
+    """Switching an alias overwrites its single entry."""
+    registry = CollectionAliasRegistry(client)
+    registry.set_alias("rules", versioned_name("rules", "1"))
+    registry.set_alias("rules", versioned_name("rules", "2"))
+
+    assert registry.aliases() == {"rules": "rules__v2"}
+
+
+def test_versions_lists_collections_of_an_alias(client):
+    """versions returns the alias's own collections, oldest first."""
+    for name in ["rules__v2", "rules__v1", "rules", "rules_extra", "other__v1"]:
+        client.create_collection(name)
+    registry = CollectionAliasRegistry(client)
+
+    assert registry.versions("rules") == ["rules", "rules__v1", "rules__v2"]
+    assert ALIAS_COLLECTION not in registry.versions("rules")
+
+
+def test_alias_name_strips_version():
+    """Versioned collection names map back to their alias."""
+    assert alias_name(versioned_name("rules", "20260101")) == "rules"
+    assert alias_name("rules") == "rules"
+
+
+def test_remove_alias_resolves_name_to_itself(client):
+    """After removal the alias name is used as a plain collection name."""
+    registry = CollectionAliasRegistry(client)
+    registry.set_alias("rules", "rules__v1")
+    registry.remove_alias("rules")
+
+    assert registry.resolve("rules") == "rules"
+    assert registry.aliases() == {}
+
+
+def test_collection_names_hide_versions_and_registry(client):
+    """Readers see aliases and plain collections, not their storage."""
+    for name in ["rules__v1", "rules__v2", "logs"]:
+        client.create_collection(name)
+    registry = CollectionAliasRegistry(client)
+    registry.set_alias("rules", "rules__v2")
+
+    assert registry.collection_names() == ["logs", "rules"]
+
+
+def test_collection_names_do_not_create_registry(client):
+    """Listing a database without aliases leaves it unchanged."""
+    client.create_collection("logs")
+
+    assert CollectionAliasRegistry(client).collection_names() == ["logs"]
+    assert [c.name for c in client.list_collections()] == ["logs"]
@@ -0,0 +1,165 @@
+"""Tests for loading the downloaded Parquet datasets."""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils import config as config_module
+from src.utils import dataset_loader, processed_store
+from src.utils.config import Config
+from src.utils.dataset_loader import (
+    estimate_object_memory,
+    load_dataset,
+    load_processed_dataset,
+    to_compact_pandas,
+)
+
+DATASET = "ttp_mapping"
+
+
+@pytest.fixture
+def data_config(tmp_path, monkeypatch):
+    """Configuration whose raw and processed data live in a temporary directory."""
+    config = Config(
+        RAW_DIR=str(tmp_path / "raw"), PROCESSED_DIR=str(tmp_path / "processed")
+    )
+    monkeypatch.setattr(config_module, "config", config)
+    return config
+
+
+@pytest.fixture
+def splits(data_config):
+    """A dataset saved as train and test split files with small row groups."""
+    dataset_dir = data_config.get_raw_path() / DATASET
+    dataset_dir.mkdir(parents=True)
+    for split, start, count in [("test", 0, 4), ("train", 4, 8)]:
+        table = pa.table(
+            {
+                "text1": [
+                    f"Technique description number {i}"
+                    for i in range(start, start + count)
+                ],
+                "label": [f"T{1000 + i % 2}" for i in range(start, start + count)],
+                "split": [split] * count,
+            }
+        )
+        pq.write_table(
+            table, dataset_dir / f"{DATASET}_{split}.parquet", row_group_size=2
+        )
+    return dataset_dir
+
+
+def test_all_split_files_are_loaded(splits):
+    """Rows of every split file are read, in file name order."""
+    df = load_dataset(DATASET)
+
+    assert len(df) == 12
+    assert list(df.index) == list(range(12))
+    assert df["split"].iloc[0] == "test"
+
+
+def test_columns_are_projected(splits):
+    """Only the requested columns are read."""
+    df = load_dataset(DATASET, columns=["text1"])
+
+    assert list(df.columns) == ["text1"]
+
+
+def test_filters_keep_unfiltered_row_positions(splits):
+    """Filtered rows keep the index they have in a full load."""
+    full = load_dataset(DATASET)
+
+    df = load_dataset(DATASET, columns=["text1"], filters=[("label", "==", "T1001")])
+
+    assert list(df.index) == [1, 3, 5, 7, 9, 11]
+    assert df["text1"].tolist() == full.loc[df.index, "text1"].tolist()
+
+
+def test_missing_dataset_returns_none(data_config):
+    """A dataset without files is reported as missing."""
+    assert load_dataset("heimdall") is None
+
+
+def test_compact_loading_uses_arrow_strings_and_categoricals(splits, data_config):
+    """Repetitive columns become categoricals, free text Arrow strings."""
+    data_config.DATASET_CATEGORY_MAX_RATIO = 0.2
+
+    df = load_dataset(DATASET, compact=True)
+
+    assert df["text1"].dtype == pd.StringDtype("pyarrow")
+    assert isinstance(df["label"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["split"].dtype, pd.CategoricalDtype)
+    assert df.astype(str).equals(load_dataset(DATASET, compact=False).astype(str))
+
+
+def test_compact_conversion_without_categoricals():
+    """A ratio of None keeps every string column as string[pyarrow]."""
+    table = pa.table({"label": ["a", "a", "a", "b"], "count": [1, 2, 3, 4]})
+
+    df = to_compact_pandas(table, category_max_ratio=None)
+
+    assert df["label"].dtype == pd.StringDtype("pyarrow")
+    assert df["count"].dtype == "int64"
+
+
+def test_object_memory_estimate_matches_pandas():
+    """The estimate equals the deep memory usage of object string columns."""
+    table = pa.table(
+        {"text": ["failed login", None, "port scan on 22"], "count": [1, 2, 3]}
+    )
+    df = table.to_pandas()
+
+    expected = df.memory_usage(deep=True, index=False).sum()
+    assert estimate_object_memory(table) == expected
+
+
+@pytest.fixture
+def noisy(splits):
+    """Rewrite the test split with a short text and a duplicate row."""
+    table = pa.table(
+        {
+            "text1": [
+                "  Technique description number 0 ",
+                "short",
+                "Technique description number 0",
+            ],
+            "label": ["T1000", "T1001", "T1000"],
+            "split": ["test"] * 3,
+        }
+    )
+    pq.write_table(table, splits / f"{DATASET}_test.parquet")
+    return splits
+
+
+def test_processed_dataset_is_cleaned(noisy):
+    """Texts are stripped, short ones dropped and duplicates removed."""
+    df = load_processed_dataset(DATASET, "text1")
+
+    assert len(df) == 9
+    assert list(df.index[:2]) == [0, 3]
+    assert df["text1"].iloc[0] == "Technique description number 0"
+
+
+def test_fresh_snapshot_is_reused(noisy, monkeypatch):
+    """A second load memory-maps the snapshot without processing or rehashing."""
+    first = load_processed_dataset(DATASET, "text1")
+    calls = []
+    monkeypatch.setattr(
+        dataset_loader, "process_dataset", lambda *args: calls.append(args)
+    )
+    monkeypatch.setattr(processed_store, "file_sha256", lambda path: calls.append(path))
+
+    second = load_processed_dataset(DATASET, "text1")
+
+    assert calls == []
+    assert second.equals(first)
+
+
+def test_changed_raw_file_rebuilds_snapshot(noisy):
+    """Editing a raw file makes its snapshot stale."""
+    load_processed_dataset(DATASET, "text1")
+    table = pq.read_table(noisy / f"{DATASET}_train.parquet").slice(0, 2)
+    pq.write_table(table, noisy / f"{DATASET}_train.parquet")
+
+    assert len(load_processed_dataset(DATASET, "text1")) == 3
@@ -0,0 +1,76 @@
+"""Tests for the download manifest that makes dataset downloads resumable."""
+
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("datasets")
+
+
+@pytest.fixture
+def get_datasets(load_script):
+    """The ``01_get_datasets`` script module."""
+    return load_script("01_get_datasets")
+
+
+@pytest.fixture
+def split_file(tmp_path):
+    """A written Parquet split file."""
+    path = tmp_path / "raw" / "heimdall" / "train.parquet"
+    path.parent.mkdir(parents=True)
+    pd.DataFrame({"text": ["a", "b", "c"]}).to_parquet(path)
+    return path
+
+
+def test_recorded_file_is_complete(get_datasets, tmp_path, split_file):
+    """A recorded file with its recorded size is complete."""
+    manifest = get_datasets.DownloadManifest(tmp_path / "manifest.json")
+    manifest.record("heimdall", split_file, source="hub")
+
+    entry = manifest.get("heimdall", "train.parquet")
+    assert entry["rows"] == 3
+    assert entry["sha256"] == get_datasets.file_sha256(split_file)
+    assert manifest.completed("heimdall", split_file)
+
+
+def test_truncated_file_is_incomplete(get_datasets, tmp_path, split_file):
+    """A file whose size changed after recording is downloaded again."""
+    manifest = get_datasets.DownloadManifest(tmp_path / "manifest.json")
+    manifest.record("heimdall", split_file, source="hub")
+
+    with open(split_file, "r+b") as f:
+        f.truncate(split_file.stat().st_size // 2)
+
+    assert not manifest.completed("heimdall", split_file)
+
+
+def test_readable_unrecorded_file_is_adopted(get_datasets, tmp_path, split_file):
+    """Files written before the manifest existed are adopted if readable."""
+    manifest = get_datasets.DownloadManifest(tmp_path / "manifest.json")
+
+    assert manifest.completed("heimdall", split_file)
+    assert manifest.get("heimdall", "train.parquet")["source"] == "existing"
+
+
+def test_corrupt_unrecorded_file_is_incomplete(get_datasets, tmp_path):
+    """A partial file without a Parquet footer is not adopted."""
+    path = tmp_path / "partial.parquet"
+    path.write_bytes(b"PAR1 partial download")
+    manifest = get_datasets.DownloadManifest(tmp_path / "manifest.json")
+
+    assert not manifest.completed("heimdall", path)
+    assert manifest.get("heimdall", "partial.parquet") is None
+
+
+def test_manifest_persists_between_runs(get_datasets, tmp_path, split_file):
+    """A new run loads the entries recorded by the previous one."""
+    manifest_file = tmp_path / "manifest.json"
+    get_datasets.DownloadManifest(manifest_file).record(
+        "heimdall", split_file, source="hub"
+    )
+
+    assert "train.parquet" in json.loads(manifest_file.read_text())["heimdall"]
+    assert get_datasets.DownloadManifest(manifest_file).completed(
+        "heimdall", split_file
+    )
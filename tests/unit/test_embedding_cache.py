@@ -0,0 +1,63 @@
+"""Tests for the persistent on-disk embedding cache."""
+
+import numpy as np
+
+from src.utils.embedding_cache import KEY_BYTES, EmbeddingCache
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def vectors(count, dim=4):
+    """Distinct float32 vectors."""
+    return [np.arange(dim, dtype=np.float32) + i for i in range(count)]
+
+
+def test_lookups_count_hits_and_misses(tmp_path):
+    """Cached texts are returned and counted; others are None."""
+    cache = EmbeddingCache(tmp_path, MODEL)
+    cache.put_many(["port scan", "failed login"], vectors(2))
+
+    found = cache.get_many(["failed  login", "dns tunnel"])
+
+    np.testing.assert_array_equal(found[0], vectors(2)[1])
+    assert found[1] is None
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_entries_survive_reopening(tmp_path):
+    """A new cache on the same directory reads earlier appends."""
+    first = EmbeddingCache(tmp_path, MODEL)
+    first.put_many(["a", "b"], vectors(2))
+    first.put_many(["b", "c"], vectors(3)[1:])
+
+    reopened = EmbeddingCache(tmp_path, MODEL)
+
+    assert reopened.stats()["entries"] == 3
+    np.testing.assert_array_equal(reopened.get_many(["c"])[0], vectors(3)[2])
+
+
+def test_keys_depend_on_model(tmp_path):
+    """Caches of different models do not share entries."""
+    EmbeddingCache(tmp_path, MODEL).put_many(["a"], vectors(1))
+
+    assert EmbeddingCache(tmp_path, "other-model").get_many(["a"]) == [None]
+
+
+def test_interrupted_append_is_truncated(tmp_path):
+    """Rows without both a key and a vector are dropped on load."""
+    cache = EmbeddingCache(tmp_path, MODEL)
+    cache.put_many(["a", "b"], vectors(2))
+    with open(cache.vectors_file, "ab") as f:
+        f.write(vectors(1)[0].tobytes()[:6])  # Torn vector write
+    with open(cache.keys_file, "ab") as f:
+        f.write(cache.key("c"))  # Key whose vector never landed
+
+    reopened = EmbeddingCache(tmp_path, MODEL)
+
+    assert reopened.stats()["entries"] == 2
+    assert cache.keys_file.stat().st_size == 2 * KEY_BYTES
+    assert cache.vectors_file.stat().st_size == 2 * 4 * 4
+    reopened.put_many(["c"], vectors(3)[2:])
+    np.testing.assert_array_equal(
+        EmbeddingCache(tmp_path, MODEL).get_many(["c"])[0], vectors(3)[2]
+    )
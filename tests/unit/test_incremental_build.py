@@ -0,0 +1,96 @@
+"""Tests for incremental vector database builds."""
+
+import pandas as pd
+import pytest
+
+DATASET = "security_attacks"
+
+
+@pytest.fixture
+def build(load_script):
+    """The ``04_build_chromadb`` script module."""
+    return load_script("04_build_chromadb")
+
+
+@pytest.fixture
+def builder(build, chroma_config):
+    """Builder connected to a temporary index."""
+    builder = build.ChromaDBBuilder(chroma_config)
+    assert builder.connect_to_chromadb()
+    return builder
+
+
+@pytest.fixture
+def embed_calls(build, monkeypatch):
+    """Record the batches the builder embeds; ``fail_on`` makes one call fail."""
+    calls = {"batches": [], "fail_on": None}
+    embed_documents = build.embed_documents
+
+    def embed(texts):
+        calls["batches"].append(len(texts))
+        if len(calls["batches"]) == calls["fail_on"]:
+            raise RuntimeError("embedding worker died")
+        return embed_documents(texts)
+
+    monkeypatch.setattr(build, "embed_documents", embed)
+    return calls
+
+
+def attacks(count, start=0):
+    """Attack pattern rows as the security_attacks dataset provides them."""
+    return pd.DataFrame(
+        {
+            "text": [f"Attack pattern description number {i}" for i in range(count)],
+            "label": [f"T{1000 + i % 7}" for i in range(count)],
+        },
+        index=range(start, start + count),
+    )
+
+
+def test_incremental_build_writes_only_changes(builder, embed_calls):
+    """Unchanged documents are skipped and removed ones deleted."""
+    collection = builder.create_collection(DATASET)
+    assert builder.add_documents_to_collection(DATASET, attacks(50))
+    manifest = builder.load_manifest("attack_patterns")
+    assert len(manifest) == 50
+
+    changed = attacks(50).drop(index=[49])
+    changed.loc[0, "label"] = "T9999"
+    embed_calls["batches"] = []
+
+    assert builder.add_documents_to_collection(DATASET, changed, incremental=True)
+
+    assert sum(embed_calls["batches"]) == 1
+    assert collection.count() == 49
+    assert collection.get(ids=["security_attacks_0"])["metadatas"][0]["label"] == (
+        "T9999"
+    )
+    assert "security_attacks_49" not in builder.load_manifest("attack_patterns")
+
+
+def test_streamed_build_writes_manifest_by_chunk(builder):
+    """A build from DataFrame chunks records every document in the manifest."""
+    df = attacks(30)
+    documents, metadatas, ids = builder.prepare_documents(DATASET, df)
+    builder.create_collection(DATASET)
+
+    chunks = (df.iloc[start : start + 10] for start in (0, 10, 20))
+    assert builder.add_documents_to_collection(DATASET, chunks)
+
+    assert builder.load_manifest("attack_patterns") == {
+        doc_id: builder.content_hash(document, metadata)
+        for document, metadata, doc_id in zip(documents, metadatas, ids)
+    }
+
+
+def test_failed_build_keeps_previous_manifest(builder, embed_calls):
+    """A partial manifest never replaces the last complete one."""
+    builder.create_collection(DATASET)
+    assert builder.add_documents_to_collection(DATASET, attacks(5))
+    before = builder.load_manifest("attack_patterns")
+
+    embed_calls["fail_on"] = len(embed_calls["batches"]) + 1
+    assert not builder.add_documents_to_collection(DATASET, attacks(8))
+
+    assert builder.load_manifest("attack_patterns") == before
+    assert list(builder.manifest_dir.glob("*.tmp")) == []
@@ -0,0 +1,81 @@
+"""Tests for MinHash/LSH near-duplicate folding."""
+
+from src.utils.near_duplicates import NearDuplicateIndex, label_key, lsh_bands
+
+BASE = (
+    "Detected PowerShell process spawning an encoded command that downloads "
+    "a second stage payload from a remote server and writes it to the "
+    "temporary directory of the current user before executing it"
+)
+
+
+def test_lsh_bands_split_permutations_near_threshold():
+    """The band split divides the permutations and centres on the threshold."""
+    bands, rows = lsh_bands(128, 0.9)
+
+    assert bands * rows == 128
+    assert abs((1 / bands) ** (1 / rows) - 0.9) < 0.1
+
+
+def test_label_key_ignores_row_identifiers():
+    """Row ids and positions do not make labels differ."""
+    first = label_key({"label": "T1059", "original_index": 1, "row_id": "a"})
+    second = label_key({"label": "T1059", "original_index": 2, "row_id": "b"})
+
+    assert first == second
+    assert first != label_key({"label": "T1086", "original_index": 1})
+
+
+def test_identical_text_is_folded_into_first_document():
+    """An exact repeat returns the id of the first document."""
+    index = NearDuplicateIndex(threshold=0.9)
+
+    assert index.add("a", BASE) is None
+    assert index.add("b", BASE) == "a"
+
+
+def test_one_word_variant_is_folded():
+    """A long document differing in its last word is a near duplicate."""
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add("a", BASE)
+
+    assert index.add("b", BASE.replace("executing it", "executing them")) == "a"
+
+
+def test_dissimilar_text_is_kept():
+    """Unrelated documents become representatives of their own."""
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add("a", BASE)
+
+    assert index.add("b", "Scheduled task created for persistence on host") is None
+
+
+def test_same_text_with_different_labels_is_kept():
+    """Documents are only folded into representatives with equal labels."""
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add("a", BASE, labels=label_key({"label": "T1059"}))
+
+    assert index.add("b", BASE, labels=label_key({"label": "T1105"})) is None
+    assert index.add("c", BASE, labels=label_key({"label": "T1105"})) == "b"
+
+
+def test_filter_returns_kept_documents_and_folded_ids():
+    """filter drops folded documents and maps them to their representative."""
+    index = NearDuplicateIndex(threshold=0.9)
+    documents = [BASE, BASE, BASE, "Unrelated login failure on the VPN gateway"]
+    metadatas = [
+        {"label": "T1059", "original_index": 0},
+        {"label": "T1059", "original_index": 1},
+        {"label": "T1105", "original_index": 2},
+        {"label": "T1059", "original_index": 3},
+    ]
+    ids = ["d0", "d1", "d2", "d3"]
+
+    kept_docs, kept_metadatas, kept_ids, folded = index.filter(
+        documents, metadatas, ids
+    )
+
+    assert kept_ids == ["d0", "d2", "d3"]
+    assert kept_docs == [documents[0], documents[2], documents[3]]
+    assert [m["original_index"] for m in kept_metadatas] == [0, 2, 3]
+    assert folded == {"d1": "d0"}
@@ -0,0 +1,115 @@
+"""Tests for the query result cache and its use in ChromaDBClient.query."""
+
+import pytest
+
+from src.utils import query_cache
+from src.utils.query_cache import QueryResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for the cache's monotonic clock."""
+    now = [1000.0]
+    monkeypatch.setattr(query_cache, "monotonic", lambda: now[0])
+    return now
+
+
+def test_key_normalizes_whitespace_and_where_order():
+    """Formatting-only differences map to the same key."""
+    first = QueryResultCache.key("logs", "failed  login\n", 5, {"a": 1, "b": 2})
+    second = QueryResultCache.key("logs", "failed login", 5, {"b": 2, "a": 1})
+
+    assert first == second
+    assert first != QueryResultCache.key("logs", "failed login", 3, {"a": 1, "b": 2})
+
+
+def test_get_counts_hits_and_misses():
+    """A stored value is returned and counted as a hit."""
+    cache = QueryResultCache()
+    key = cache.key("logs", "text", 5)
+
+    assert cache.get(key) is None
+    cache.put(key, {"ids": ["a"]})
+
+    assert cache.get(key) == {"ids": ["a"]}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used():
+    """The entry read least recently is evicted first."""
+    cache = QueryResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expires_entries_after_ttl(clock):
+    """Entries older than the TTL are misses and are dropped."""
+    cache = QueryResultCache(ttl_seconds=10)
+    cache.put("a", 1)
+
+    clock[0] += 10
+    assert cache.get("a") == 1
+    clock[0] += 0.1
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_drops_only_one_collection():
+    """Invalidation removes the entries of one collection."""
+    cache = QueryResultCache()
+    cache.put(cache.key("logs", "a", 5), 1)
+    cache.put(cache.key("logs", "b", 5), 2)
+    cache.put(cache.key("rules", "a", 5), 3)
+
+    assert cache.invalidate("logs") == 2
+    assert cache.get(cache.key("logs", "a", 5)) is None
+    assert cache.get(cache.key("rules", "a", 5)) == 3
+
+
+def test_client_serves_repeated_queries_from_cache(chroma_client):
+    """A repeated query text is answered without querying Chroma again."""
+    chroma_client.add_documents("logs", ["failed login from admin", "port scan"])
+
+    first = chroma_client.query("logs", ["failed login"], n_results=1)
+    second = chroma_client.query("logs", ["failed  login"], n_results=1)
+
+    assert second == first
+    stats = chroma_client.query_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_client_include_is_part_of_the_key(chroma_client):
+    """Queries for different result fields do not share cache entries."""
+    chroma_client.add_documents("logs", ["failed login from admin", "port scan"])
+
+    full = chroma_client.query("logs", ["failed login"], n_results=1)
+    distances = chroma_client.query(
+        "logs", ["failed login"], n_results=1, include=["distances"]
+    )
+
+    assert "documents" in full
+    assert set(distances) == {"ids", "distances"}
+    assert chroma_client.query_cache.stats()["hits"] == 0
+
+
+def test_client_writes_invalidate_cached_results(chroma_client):
+    """Adding documents drops the collection's cached results."""
+    chroma_client.add_documents("logs", ["failed login from admin"])
+    before = chroma_client.query("logs", ["failed login"], n_results=5)
+
+    chroma_client.add_documents("logs", ["failed login from root"])
+    after = chroma_client.query("logs", ["failed login"], n_results=5)
+
+    assert len(before["ids"][0]) == 1
+    assert len(after["ids"][0]) == 2
+    assert chroma_client.query_cache.stats()["hits"] == 0
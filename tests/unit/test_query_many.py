@@ -0,0 +1,86 @@
+"""Tests for batched multi-query retrieval in ChromaDBClient."""
+
+import pytest
+
+from src.utils.chromadb_client import batch_texts, split_hits
+
+DOCUMENTS = [f"Suspicious login attempt number {i}" for i in range(20)]
+
+
+@pytest.fixture
+def logs(chroma_client):
+    """Client with a collection of log documents."""
+    chroma_client.add_documents("logs", DOCUMENTS, ids=[str(i) for i in range(20)])
+    return chroma_client
+
+
+def test_batch_texts_keeps_order():
+    """Texts are split into consecutive batches of at most batch_size."""
+    assert batch_texts(["a", "b", "c", "d", "e"], 2) == [["a", "b"], ["c", "d"], ["e"]]
+    assert batch_texts(["a"], 0) == [["a"]]
+
+
+def test_split_hits_maps_results_back_to_texts():
+    """Every query text, repeated or not, gets the hits of its batch row."""
+    batches = [["a", "b"], ["c"]]
+    results = [
+        {"ids": [["1"], ["2"]], "distances": [[0.1], [0.2]]},
+        None,
+    ]
+
+    hits = split_hits(["b", "a", "b", "c"], batches, results)
+
+    assert hits[0] == {"ids": ["2"], "distances": [0.2]}
+    assert hits[1] == {"ids": ["1"], "distances": [0.1]}
+    assert hits[2] is hits[0]
+    assert hits[3] is None
+
+
+def test_split_hits_tolerates_empty_fields():
+    """Fields Chroma returns as empty lists stay empty per text."""
+    hits = split_hits(["a"], [["a"]], [{"ids": [["1"]], "documents": []}])
+
+    assert hits == [{"ids": ["1"], "documents": []}]
+
+
+def test_query_many_matches_single_queries(logs):
+    """Batched results equal one query per text, in input order."""
+    texts = [DOCUMENTS[3], DOCUMENTS[7], DOCUMENTS[3], DOCUMENTS[11]]
+
+    hits = logs.query_many("logs", texts, n_results=2, batch_size=2, max_workers=2)
+
+    assert [hit["ids"][0] for hit in hits] == ["3", "7", "3", "11"]
+    for text, hit in zip(texts, hits):
+        single = logs.query("logs", [text], n_results=2)
+        assert hit == {field: values[0] for field, values in single.items()}
+
+
+def test_query_many_queries_unique_texts_once(logs, monkeypatch):
+    """Repeated texts are sent to Chroma once, in batches of batch_size."""
+    sent = []
+    query = logs.query
+
+    def record(collection_name, batch, *args):
+        sent.append(list(batch))
+        return query(collection_name, batch, *args)
+
+    monkeypatch.setattr(logs, "query", record)
+    texts = DOCUMENTS[:5] * 3
+
+    hits = logs.query_many("logs", texts, n_results=1, batch_size=2)
+
+    assert sorted(sum(sent, [])) == sorted(DOCUMENTS[:5])
+    assert [len(batch) for batch in sent] == [2, 2, 1]
+    assert len(hits) == 15
+
+
+def test_query_many_returns_only_included_fields(logs):
+    """include narrows the fields of every hit."""
+    hits = logs.query_many("logs", DOCUMENTS[:3], n_results=1, include=["distances"])
+
+    assert all(set(hit) == {"ids", "distances"} for hit in hits)
+
+
+def test_query_many_without_texts(logs):
+    """No query texts give no results."""
+    assert logs.query_many("logs", []) == []